@@ -1,16 +1,23 @@
 # Standard library imports
-import sys
 import time
 import random
 import datetime
 import os
+import argparse
+import queue
+import threading
+import heapq
+import atexit
+import functools
+import itertools
+import operator
+import sys
+from concurrent.futures import Future
 
 # Third-party imports
 import pandas as pd
-import requests
 import json
 
-import selenium
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -24,10 +31,25 @@ from selenium.common.exceptions import (
 )
 import colorlog
 import logging
+import logging.handlers
 from colorama import init, Fore
 
+# Local imports
+from adspower import AdsPowerClient, AdsPowerError
+from failures import AMBIGUOUS, INFRA, UI, WALLET, CircuitBreaker, MintFailed, RetryPolicy, classify
+from leases import LeaseManager
+from metrics import MetricsServer, MintMetrics
+from resources import AdmissionController, ResourceGovernor
+from sheet_cache import SheetCache
+from state_store import StateError, StateStore, TIMESTAMP_FORMAT, MAX_TRX, MINT_COOLDOWN_HOURS, parse_timestamp
+from tracing import Tracer
+from zora_rpc import FeeOracle, ReceiptWatcher, RpcError, ZoraRpcClient
+
 
 if not os.path.isfile('config_user.json'):
+    if not sys.stdin.isatty():
+        # Nobody can answer the prompts, e.g. when started by cron or `cli.py run`.
+        sys.exit("config_user.json is missing. Run Skript.py once interactively or create it by hand.")
 
     print("You need to set parameter, they can be change any time in 'config_user' file")
     print("New skript need you metamask identificator, it look like this:")
@@ -56,171 +78,284 @@ with open('config_user.json', 'r') as f:
 IDENTIFICATOR = str(config_user['IDENTIFICATOR'])
 MIN_DELAY = int(config_user['MIN_DELAY'])
 MAX_DELAY = int(config_user['MAX_DELAY'])
+# The free feed only changes every few hours, so the harvested collections are reused for this long.
+FEED_CACHE_TTL = int(config_user.get('FEED_CACHE_TTL', 3600))
+ADSPOWER_URL = str(config_user.get('ADSPOWER_URL', "http://local.adspower.net:50325"))
+ADSPOWER_RATE = float(config_user.get('ADSPOWER_RATE', 1))
+# Seconds between the reaping of orphaned chromedrivers and the resource report, 0 to disable.
+REAP_INTERVAL = float(config_user.get('REAP_INTERVAL', 60))
+# Admission control of browser launches: running browsers (0 = only limited by --workers), launches
+# per second (0 = no limit), and the host load above which launches are held off.
+MAX_BROWSERS = int(config_user.get('MAX_BROWSERS', 0))
+LAUNCH_RATE = float(config_user.get('LAUNCH_RATE', 0))
+MAX_CPU_PERCENT = float(config_user.get('MAX_CPU_PERCENT', 85))
+MIN_FREE_MEMORY_MB = float(config_user.get('MIN_FREE_MEMORY_MB', 1024))
+# Rainbow console output can be switched off, e.g. when only the JSON log file is wanted.
+RAINBOW_CONSOLE = bool(config_user.get('RAINBOW_CONSOLE', True))
+LOG_JSON_PATH = config_user.get('LOG_JSON_PATH')
+# Decide mint success by the transaction receipt instead of the mint.fun toast.
+ONCHAIN_CONFIRMATION = bool(config_user.get('ONCHAIN_CONFIRMATION', False))
+ZORA_RPC_URL = str(config_user.get('ZORA_RPC_URL', "https://rpc.zora.energy/"))
+RECEIPT_TIMEOUT = float(config_user.get('RECEIPT_TIMEOUT', 300))
+# Gas values typed into MetaMask come from the Zora RPC and are shared by all workers for this long.
+FEE_CACHE_TTL = float(config_user.get('FEE_CACHE_TTL', 30))
+# Headroom of the max base fee over the base fee of the next block.
+FEE_MULTIPLIER = float(config_user.get('FEE_MULTIPLIER', 2))
+# Step timings of every profile, summarize them with `python tracing.py`. Set to "" to disable.
+TRACE_PATH = config_user.get('TRACE_PATH', "trace.jsonl")
+# Several hosts can share one state database (e.g. on a network drive) and split the accounts
+# through leases instead of start/end ranges, see `leases.py`.
+STATE_PATH = str(config_user.get('STATE_PATH', "state.db"))
+COORDINATION = bool(config_user.get('COORDINATION', False))
+LEASE_TTL = float(config_user.get('LEASE_TTL', 120))
+HOST_ID = config_user.get('HOST_ID')
+# Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics, 0 to disable.
+METRICS_PORT = int(config_user.get('METRICS_PORT', 0))
+METRICS_HOST = str(config_user.get('METRICS_HOST', "127.0.0.1"))
+# Dispatch pauses for BREAKER_RESET seconds after BREAKER_THRESHOLD consecutive AdsPower failures, or
+# RPC failures when ONCHAIN_CONFIRMATION makes the mint outcome depend on the RPC.
+BREAKER_THRESHOLD = int(config_user.get('BREAKER_THRESHOLD', 5))
+BREAKER_RESET = float(config_user.get('BREAKER_RESET', 60))
 METAMASK_URL = f"chrome-extension://{IDENTIFICATOR}/home.html#"
 DATA_PATH = "Data.xlsx"
-
-# Load data
-df = pd.read_excel(DATA_PATH)
+FREE_FEED_URL = "https://mint.fun/feed/free?chain=zora"
+TRENDING_FEED_URL = "https://mint.fun/feed/trending"
+RETRY_DELAY = 300
+NEVER_MINTED = pd.Timestamp("1970-01-01")
+
+# Deadlines (in seconds) of the condition-based waits in the MetaMask/mint flow.
+POLL_INTERVAL = 0.25
+PAGE_LOAD_TIMEOUT = 15
+CLICK_TIMEOUT = 30
+INPUT_TIMEOUT = 20
+NETWORK_LIST_TIMEOUT = 5
+NOTIFICATION_TIMEOUT = 25
+MINT_RESULT_TIMEOUT = 40
+TX_HASH_TIMEOUT = 10
+
+# Load data from the columnar cache, Data.xlsx is only parsed again when it changed.
+sheet = SheetCache(DATA_PATH)
+# The passwords stay on disk until a browser needs one, see `sheet.column('Password')`.
+df = sheet.frame(exclude=('Password',))
 df.index = range(1, len(df) + 1)
 
-# Retrieve profiles and passwords
+# Retrieve profiles
 profiles = df['Profile ID'].tolist()
-passwords = df['Password'].tolist()
 
-def update_excel_with_timestamp(idx, file_path, df, logger):
+# Pause all dispatch while AdsPower or the RPC keeps failing.
+adspower_breaker = CircuitBreaker("AdsPower", BREAKER_THRESHOLD, BREAKER_RESET)
+rpc_breaker = CircuitBreaker("Zora RPC", BREAKER_THRESHOLD, BREAKER_RESET)
+# Backoff of failed accounts, separately for every failure class, see `failures.py`.
+retry_policy = RetryPolicy()
+
+# One pooled client of the AdsPower local API for all workers.
+adspower = AdsPowerClient(ADSPOWER_URL, ADSPOWER_RATE, breaker=adspower_breaker)
+
+# Confirms mint transactions on-chain in the background when ONCHAIN_CONFIRMATION is on.
+rpc_client = ZoraRpcClient(ZORA_RPC_URL, breaker=rpc_breaker)
+receipt_watcher = ReceiptWatcher(rpc_client, timeout=RECEIPT_TIMEOUT)
+
+# Suggests the gas values of every mint transaction.
+fee_oracle = FeeOracle(rpc_client, FEE_CACHE_TTL, base_fee_multiplier=FEE_MULTIPLIER)
+
+# Records the duration of every step of `process_profile`.
+tracer = Tracer(TRACE_PATH)
+
+# Counters, gauges and latency histograms of the run, served when METRICS_PORT is set.
+metrics = MintMetrics()
+metrics.live_browsers.set_function(lambda: len(adspower.started))
+tracer.listeners.append(metrics.observe_span)
+
+# Parse the timestamps once, rows that were never minted become NaT.
+df['Time_Stamp'] = pd.to_datetime(df['Time_Stamp'], errors='coerce')
+
+# Progress is kept in the state store, Data.xlsx only gets regenerated on export.
+store = StateStore(STATE_PATH, shared=COORDINATION)
+try:
+    # Progress follows the Profile ID, rows of Data.xlsx may be inserted, deleted or re-sorted.
+    store.seed(df)
+except StateError as e:
+    sys.exit(f"Data.xlsx doesn't match the state store: {e}")
+store.load_into(df)
+
+# Serializes updates of `df` between workers.
+df_lock = threading.Lock()
+
+# Initialize the colorama library once, it provides an interface for producing colored terminal text.
+init()
+
+# The sequence of colors used by the rainbow, cycled over the characters of a message.
+RAINBOW_COLORS = [Fore.RED, Fore.YELLOW, Fore.GREEN, Fore.CYAN, Fore.BLUE, Fore.MAGENTA]
+LOG_FORMAT = "|%(log_color)s%(asctime)s| - Profile [%(name)s] - %(levelname)s - %(message)s"
+LOG_COLORS = {
+    'DEBUG': 'cyan',
+    'INFO': 'green',
+    'WARNING': 'yellow',
+    'ERROR': 'red',
+    'CRITICAL': 'red,bg_white',
+}
+
+
+def rainbow_colorize(text):
     """
-    Updates the timestamp in the provided dataframe and saves it to an excel file.
+    Transforms a given text into a sequence of rainbow colors.
 
-    Args:
-    - idx (int): Index of the profile.
-    - file_path (str): Path to the excel file.
-    - df (pd.DataFrame): The data frame containing profile data.
-    - logger (logging.Logger): Configured logger instance.
+    Parameters:
+    - text (str): The text to be colorized.
 
     Returns:
-    None
+    - str: The rainbow colorized text.
     """
-    try:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        df.at[idx, 'Time_Stamp'] = timestamp
-        df.to_excel(file_path, index=False)
-        logger.info(f"Timestamp updated for ID {idx} to {timestamp}")
-    except Exception as e:
-        logger.error(f"Error updating timestamp for ID {idx}: {e}")
-def get_time_difference_in_hours(idx, df, logger):
-    """
-    Calculates the time difference in hours between the current time and the last transaction time.
+    # Pair every character with the next color of the sequence and join everything at once.
+    return "".join(map(operator.add, itertools.cycle(RAINBOW_COLORS), text))
 
-    Args:
-    - idx (int): Index of the profile.
-    - df (pd.DataFrame): The data frame containing profile data.
-    - logger (logging.Logger): Configured logger instance.
 
-    Returns:
-    - float: Time difference in hours. Returns 99999 in case of an error.
+class RainbowColoredFormatter(colorlog.ColoredFormatter):
     """
-    try:
-        timestamp_str = str(df.at[idx, 'Time_Stamp'])
-        last_transaction_time = datetime.datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-        current_time = datetime.datetime.now()
-        time_difference = current_time - last_transaction_time
-        hours_passed = time_difference.total_seconds() / 3600
-        logger.info(f"Time difference for ID {idx}: {hours_passed:.2f} hours")
-        return hours_passed
-    except Exception as e:
-        logger.error(f"Error reading timestamp for ID {idx}: {e}")
-        return 99999
-def check_max_trx_reached(df, max_trx):
+    Custom logging formatter class that extends the ColoredFormatter from the colorlog library.
+    This formatter first applies rainbow colorization to the entire log message before using the
+    standard level-based coloring.
     """
-    Checks if the maximum number of transactions has been reached for all profiles.
 
-    Args:
-    - df (pd.DataFrame): The data frame containing profile data.
-    - max_trx (int): Maximum number of transactions.
+    def format(self, record):
+        """
+        Format the log record. Overridden from the base class to apply rainbow colorization.
 
-    Returns:
-    - bool: True if maximum transactions reached, False otherwise.
+        Parameters:
+        - record (LogRecord): The log record.
+
+        Returns:
+        - str: The formatted log message.
+        """
+        # First rainbow colorize the entire message.
+        message = super().format(record)
+        rainbow_message = rainbow_colorize(message)
+        return rainbow_message
+
+
+class JsonLineFormatter(logging.Formatter):
     """
-    for value in df['Mint_total']:
-        if value < max_trx:
-            return False
-    return True
-def SetupGayLogger(logger_name):
+    Formats a log record as one JSON object per line for the structured log file.
     """
-    SetupGayLogger initializes a colorful logging mechanism, presenting each log message in a beautiful
-    rainbow sequence. The function accepts a logger name and returns a logger instance that can be used
-    for logging messages.
 
-    Parameters:
-    - logger_name (str): A name for the logger.
+    def format(self, record):
+        return json.dumps({
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'profile': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }, ensure_ascii=False)
 
-    Returns:
-    - logger (Logger): A configured logger instance.
+
+def build_log_handlers():
     """
+    Creates the handlers shared by every logger of the script.
 
-    # Initialize the colorama library, which provides an interface for producing colored terminal text.
-    init()
+    With LOG_JSON_PATH set, loggers only put records on a queue; a QueueListener thread writes
+    them as JSON lines to the file (and to the rainbow console if RAINBOW_CONSOLE is on), so
+    formatting and I/O never run on the worker threads.
 
-    def rainbow_colorize(text):
-        """
-        Transforms a given text into a sequence of rainbow colors.
+    Returns:
+    - list: Handlers to attach to every logger.
+    """
+    console_handlers = []
+    if RAINBOW_CONSOLE:
+        # Create a stream handler to output log messages to the console.
+        console_handler = colorlog.StreamHandler()
+        console_handler.setFormatter(
+            RainbowColoredFormatter(LOG_FORMAT, datefmt=None, reset=False, log_colors=LOG_COLORS,
+                                    secondary_log_colors={}, style='%')
+        )
+        console_handlers.append(console_handler)
 
-        Parameters:
-        - text (str): The text to be colorized.
+    if not LOG_JSON_PATH:
+        return console_handlers
 
-        Returns:
-        - str: The rainbow colorized text.
-        """
-        # Define the sequence of colors to be used.
-        colors = [Fore.RED, Fore.YELLOW, Fore.GREEN, Fore.CYAN, Fore.BLUE, Fore.MAGENTA]
-        colored_message = ''
+    file_handler = logging.FileHandler(LOG_JSON_PATH, encoding='utf-8')
+    file_handler.setFormatter(JsonLineFormatter())
+    listener = logging.handlers.QueueListener(queue.SimpleQueue(), file_handler, *console_handlers,
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return [logging.handlers.QueueHandler(listener.queue)]
 
-        # For each character in the text, assign a color from the sequence.
-        for index, char in enumerate(text):
-            color = colors[index % len(colors)]
-            colored_message += color + char
 
-        # Return the colorized text and reset the color.
-        return colored_message
+log_handlers = build_log_handlers()
 
-    class RainbowColoredFormatter(colorlog.ColoredFormatter):
-        """
-        Custom logging formatter class that extends the ColoredFormatter from the colorlog library.
-        This formatter first applies rainbow colorization to the entire log message before using the
-        standard level-based coloring.
-        """
 
-        def format(self, record):
-            """
-            Format the log record. Overridden from the base class to apply rainbow colorization.
+@functools.lru_cache(maxsize=None)
+def SetupGayLogger(logger_name):
+    """
+    SetupGayLogger initializes a colorful logging mechanism, presenting each log message in a beautiful
+    rainbow sequence. The function accepts a logger name and returns a logger instance that can be used
+    for logging messages.
 
-            Parameters:
-            - record (LogRecord): The log record.
+    Loggers are configured once per name and then reused, so calling it for every account is cheap.
 
-            Returns:
-            - str: The formatted log message.
-            """
-            # First rainbow colorize the entire message.
-            message = super().format(record)
-            rainbow_message = rainbow_colorize(message)
-            return rainbow_message
+    Parameters:
+    - logger_name (str): A name for the logger.
 
+    Returns:
+    - logger (Logger): A configured logger instance.
+    """
     # Obtain an instance of a logger for the provided name.
     logger = colorlog.getLogger(logger_name)
 
     # Ensure that if there are any pre-existing handlers attached to this logger, they are removed.
     # This prevents duplicate messages from being displayed.
-    while logger.hasHandlers():
-        logger.removeHandler(logger.handlers[0])
-
-    # Create a stream handler to output log messages to the console.
-    handler = colorlog.StreamHandler()
-
-    # Assign the custom formatter to the handler.
-    handler.setFormatter(
-        RainbowColoredFormatter(
-            "|%(log_color)s%(asctime)s| - Profile [%(name)s] - %(levelname)s - %(message)s",
-            datefmt=None,
-            reset=False,
-            log_colors={
-                'DEBUG': 'cyan',
-                'INFO': 'green',
-                'WARNING': 'yellow',
-                'ERROR': 'red',
-                'CRITICAL': 'red,bg_white',
-            },
-            secondary_log_colors={},
-            style='%'
-        )
-    )
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
 
-    # Attach the handler to the logger.
-    logger.addHandler(handler)
+    # Attach the shared handlers to the logger.
+    for handler in log_handlers:
+        logger.addHandler(handler)
+    logger.propagate = False
 
     # Set the minimum logging level to DEBUG. This means messages of level DEBUG and above will be processed.
     logger.setLevel(logging.DEBUG)
 
     return logger
+
+
+# Owns the teardown of every WebDriver and reaps leaked chromedriver processes during long runs.
+governor = ResourceGovernor(adspower, SetupGayLogger("Governor"), REAP_INTERVAL, store)
+atexit.register(governor.shutdown)
+# Holds back browser launches while the host is saturated.
+admission = AdmissionController(SetupGayLogger("Admission"), MAX_BROWSERS, LAUNCH_RATE,
+                                MAX_CPU_PERCENT, MIN_FREE_MEMORY_MB)
+# Claims accounts in the shared state database when several hosts work the same accounts.
+leases = LeaseManager(STATE_PATH, HOST_ID, LEASE_TTL, on_lost=lambda accounts: SetupGayLogger("Leases").warning(
+    f"Lost the leases of accounts {sorted(accounts)} to another host.")) if COORDINATION else None
+def wait_until(condition, timeout, interval=POLL_INTERVAL):
+    """
+    Polls a cheap condition until it holds or the deadline passes.
+
+    Args:
+    - condition (callable): Function without arguments; its first truthy result is returned.
+      Elements that disappear or go stale while the condition runs count as "not yet".
+    - timeout (float): Maximum number of seconds to wait.
+    - interval (float): Seconds between two polls.
+
+    Returns:
+    - The truthy value returned by the condition, or None if the deadline passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            value = condition()
+        except (NoSuchElementException, StaleElementReferenceException):
+            value = None
+        if value:
+            return value
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+def wait_for_element(driver, locator, timeout):
+    """
+    Waits until an element is present on the page and returns it, or None after `timeout` seconds.
+    """
+    return wait_until(lambda: driver.find_element(By.XPATH, locator), timeout)
 def click_if_exists(driver, locator):
     """
     Tries to find and click an element on the web page using its XPATH locator.
@@ -229,11 +364,10 @@ def click_if_exists(driver, locator):
     attempts = 0
     while attempts < max_attempts:
         try:
-            element = WebDriverWait(driver, 30).until(
+            element = WebDriverWait(driver, CLICK_TIMEOUT, poll_frequency=POLL_INTERVAL).until(
                 EC.element_to_be_clickable((By.XPATH, locator))
             )
             element.click()
-            time.sleep(random.uniform(1.3, 2.1))
             return True
         except TimeoutException:
             return False
@@ -241,23 +375,51 @@ def click_if_exists(driver, locator):
             logger = SetupGayLogger("Emergency massage")
             logger.warning("Element became stale. Retrying...")
             attempts += 1
-            time.sleep(3)
     return False
-def confirm_transaction(driver, logger):
+def format_gwei(value):
+    """
+    Formats a fee in gwei for MetaMask's gas fields: at most 9 decimals (1 wei), decimal comma.
+    """
+    return f"{max(value, 1e-9):.9f}".rstrip("0").rstrip(".").replace(".", ",")
+def suggest_gas(logger):
+    """
+    Returns the max base fee and priority fee for the advanced gas form, see `zora_rpc.FeeOracle`.
+
+    Args:
+    - logger (logging.Logger): Configured logger instance.
+
+    Returns:
+    - tuple: (max_base_fee, priority_fee) as strings in gwei, formatted for the MetaMask fields.
+    """
+    fees = fee_oracle.fees()
+    if fees is None:
+        logger.warning("No fee suggestion from the Zora RPC. Falling back to a random gas value.")
+        gas = random.uniform(0.005, 0.05)
+        fees = (gas, gas)
+    return format_gwei(fees[0]), format_gwei(fees[1])
+def confirm_transaction(driver, logger, known_handles=None):
     """
     Sets gas values and confirms a transaction on the MetaMask extension.
+
+    `known_handles` are the window handles that existed before the transaction was requested,
+    see `find_metamask_notification`.
     """
-    metamask_window_handle = find_metamask_notification(driver, logger)
+    metamask_window_handle = find_metamask_notification(driver, logger, known_handles)
 
     if metamask_window_handle:
         logger.info("Setting gas values in MetaMask.")
         click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[5]/div[2]/div/div/div/div[1]/button')
         click_if_exists(driver, '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/button')
-        gas = f"{random.uniform(0.005, 0.05):.5f}".replace(".", ",")
-        input_text_if_exists(driver, '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[2]/label/div[2]/input', gas)
-        input_text_if_exists(driver, '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[3]/label/div[2]/input', gas)
-        click_if_exists(driver, '//*[@id="popover-content"]/div/div/section/div[3]/button')
-        logger.info("Gas values set successfully.")
+        max_base_fee, priority_fee = suggest_gas(logger)
+        results = batch_interact(driver, [
+            ('fill', '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[2]/label/div[2]/input', max_base_fee),
+            ('fill', '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[3]/label/div[2]/input', priority_fee),
+            ('click', '//*[@id="popover-content"]/div/div/section/div[3]/button'),
+        ])
+        if all(results):
+            logger.info("Gas values set successfully.")
+        else:
+            logger.warning(f"Setting gas values only partly worked: {results}")
 
         find_confirm_button_js = '''
         function findConfirmButton() {
@@ -274,13 +436,14 @@ def confirm_transaction(driver, logger):
                     return True
                 logger.info(f"Attempting to click the confirm button ({i + 1}/5)...")
                 driver.execute_script("arguments[0].click();", confirm_button)
-                time.sleep(3)
+                # The notification window closes as soon as MetaMask accepted the click.
+                wait_until(lambda: metamask_window_handle not in driver.window_handles, 3)
             return True
         else:
             logger.warning("Unable to find the 'Confirm' button in MetaMask.")
             return False
     else:
-        logger.warning(f"MetaMask Notification window not found after 5 attempts.")
+        logger.warning(f"MetaMask Notification window not found after {NOTIFICATION_TIMEOUT} seconds.")
         return False
 def input_text_if_exists(driver, locator, text):
     """
@@ -290,14 +453,12 @@ def input_text_if_exists(driver, locator, text):
     attempts = 0
     while attempts < max_attempts:
         try:
-            element = WebDriverWait(driver, 20).until(
+            element = WebDriverWait(driver, INPUT_TIMEOUT, poll_frequency=POLL_INTERVAL).until(
                 EC.presence_of_element_located((By.XPATH, locator))
             )
             element.clear()  # Clearing any existing text in the input field
-            # Typing the provided text character by character
-            for character in text:
-                element.send_keys(character)
-                time.sleep(random.uniform(0.075, 0.124))
+            # Typing the provided text with one WebDriver call
+            element.send_keys(text)
             return True
         except TimeoutException:
             return False
@@ -305,272 +466,1241 @@ def input_text_if_exists(driver, locator, text):
             logger = SetupGayLogger("Emergency massage")
             logger.warning("Input element became stale. Retrying...")
             attempts += 1
-            time.sleep(3)
     return False
-def find_metamask_notification(driver, logger):
+# Resolves every locator of a batch and, once all of them exist (or if `requireAll` is false),
+# fills inputs through the native value setter so React picks the change up, and clicks buttons.
+# The actions run in order and stop at the first one that fails, the rest are reported as null
+# (not run), so e.g. a Save button is never clicked after one of its fields rejected the value.
+BATCH_JS = '''
+const actions = arguments[0];
+const requireAll = arguments[1];
+const elements = actions.map(action => document.evaluate(action[1], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue);
+if (requireAll && elements.some(element => !element)) {
+    return null;
+}
+const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+const run = (action, element) => {
+    if (!element) {
+        return false;
+    }
+    if (action[0] === 'fill') {
+        element.focus();
+        setValue.call(element, action[2]);
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+        return element.value === action[2];
+    }
+    if (element.disabled) {
+        return false;
+    }
+    element.click();
+    return true;
+};
+const results = actions.map(() => null);
+for (let i = 0; i < actions.length; i++) {
+    results[i] = run(actions[i], elements[i]);
+    if (!results[i]) {
+        break;
+    }
+}
+return results;
+'''
+def batch_interact(driver, actions, timeout=None):
+    """
+    Fills and clicks several elements with one `execute_script` call instead of a WebDriver round
+    trip per element and per character.
+
+    The batch is polled until all locators are present (or the deadline passes, then whatever is
+    present is used). The script stops at the first action it could not complete - a missing
+    element, a disabled button, an input that rejected the value. That action and the ones after
+    it fall back to `input_text_if_exists`/`click_if_exists`, in order, and the batch ends at the
+    first fallback that fails too, so a submit button is only clicked after all its fields are set.
+
+    Args:
+    - driver (webdriver.Chrome): Driver of the profile.
+    - actions (list): ("fill", locator, text) and ("click", locator) tuples, run in order.
+    - timeout (float): Seconds to wait for all locators to appear, INPUT_TIMEOUT by default.
+
+    Returns:
+    - list: True/False per action; False also for actions that were not run.
     """
-    Searches for the MetaMask Notification window among the open browser windows.
+    if timeout is None:
+        # Looked up at call time, so changes of INPUT_TIMEOUT (e.g. by the benchmark) apply.
+        timeout = INPUT_TIMEOUT
+    actions = [list(action) for action in actions]
+    results = wait_until(lambda: driver.execute_script(BATCH_JS, actions, True), timeout)
+    if results is None:
+        results = driver.execute_script(BATCH_JS, actions, False)
+
+    for i, action in enumerate(actions):
+        if results[i]:
+            continue
+        if action[0] == 'fill':
+            results[i] = input_text_if_exists(driver, action[1], action[2])
+        else:
+            results[i] = click_if_exists(driver, action[1])
+        if not results[i]:
+            break
+    return [bool(result) for result in results]
+def find_metamask_notification(driver, logger, known_handles=None):
     """
-    metamask_window_handle = None
+    Waits for the MetaMask Notification window and switches to it.
 
-    for attempt in range(5):
-        time.sleep(5)
+    Only windows that are not in `known_handles` (a snapshot of `driver.window_handles` taken
+    before the action that opens the pop-up) are inspected, so the driver doesn't have to switch
+    into every open tab on every poll. Without a snapshot all windows are candidates.
 
+    Returns:
+    - str: Handle of the notification window, or None if it didn't show up in time.
+    """
+    known_handles = set(known_handles or ())
+
+    def notification_handle():
         for handle in driver.window_handles:
+            if handle in known_handles:
+                continue
             driver.switch_to.window(handle)
             if 'MetaMask Notification' in driver.title:
-                metamask_window_handle = handle
-                logger.info("Found the MetaMask Notification window!")
-                break
-
-        if metamask_window_handle:
-            break
+                return handle
+        return None
 
+    metamask_window_handle = wait_until(notification_handle, NOTIFICATION_TIMEOUT)
+    if metamask_window_handle:
+        logger.info("Found the MetaMask Notification window!")
     return metamask_window_handle
 
 
+class CollectionCache:
+    """
+    Process-wide cache of the free Zora collection links, shared by all workers.
+
+    The links are harvested from the free feed at most once per `ttl` seconds; while the cache is
+    fresh, profiles go straight to the selected collection and never open the feed page.
+    """
+
+    # Returns every collection link of the feed in a single WebDriver round trip.
+    HARVEST_JS = '''
+    const snapshot = document.evaluate(
+        '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[3]/div/div/div[2]/div[1]/div[1]/div/span/a',
+        document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const links = [];
+    for (let i = 0; i < snapshot.snapshotLength; i++) {
+        links.push(snapshot.snapshotItem(i).href);
+    }
+    return links;
+    '''
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.links = []
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+    def is_fresh(self):
+        return bool(self.links) and time.monotonic() - self.fetched_at < self.ttl
+
+    def get(self, driver, logger):
+        """
+        Returns the cached collection links, harvesting them with the given driver if the cache is stale.
+
+        Only one worker harvests at a time, the others wait for its result instead of loading the feed too.
+
+        Args:
+        - driver (webdriver.Chrome): Driver of the profile that needs the links.
+        - logger (logging.Logger): Configured logger instance.
+
+        Returns:
+        - list: Links of the free collections.
+        """
+        with self.lock:
+            if self.is_fresh():
+                logger.info(f"Using {len(self.links)} cached collections.")
+                return list(self.links)
+
+            # Navigate to the free Zora NFTs page.
+            logger.info("Accessing free Zora NFTs page...")
+            driver.get(FREE_FEED_URL)
+
+            # Scroll down to load all available NFTs and wait until the cards are rendered.
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            links = wait_until(lambda: driver.execute_script(self.HARVEST_JS), PAGE_LOAD_TIMEOUT) or []
+            # Log how many free NFTs were found.
+            logger.info(f"Identified {len(links)} NFTs available for minting.")
+            self.update(links)
+            return list(links)
+
+    def update(self, links):
+        """
+        Stores freshly harvested links; an empty harvest keeps the cache stale.
+        """
+        if links:
+            self.links = list(links)
+            self.fetched_at = time.monotonic()
+
+
+collection_cache = CollectionCache(FEED_CACHE_TTL)
+
+
 def process_profile(idx, nugger):
+    """
+    Starts the AdsPower browser of an account, runs the mint flow in it and always stops it again.
+
+    Every phase of the flow is recorded as a span in the trace file, see `tracing.py`.
+
+    Args:
+    - idx (int): Zero-based index of the account.
+    - nugger (logging.Logger): Configured logger instance.
+
+    Returns:
+    - int: 1 if the mint was successful. With ONCHAIN_CONFIRMATION (or when only the transaction
+      hash settles it) a Future of the receipt check is returned instead, see `zora_rpc.ReceiptWatcher`.
+
+    Raises:
+    - AdsPowerError: If the browser could not be started.
+    - MintFailed: If the attempt failed, with its failure class; any other exception of the flow
+      is classified by `failures.classify`.
+    """
     # Extracting profile details from pre-defined lists.
     profile_id = profiles[idx]
-    password = passwords[idx]
-
-    # Starting a browser session with the extracted profile ID.
-    open_url = f"http://local.adspower.net:50325/api/v1/browser/start?user_id={profile_id}"
-    resp = requests.get(open_url).json()
-
-    # If there's an error starting the browser, notify and exit the script.
-    if resp["code"] != 0:
-        nugger.error(resp["msg"])
-        nugger.error("Failed to start a driver")
-        sys.exit()
-
-    # Set up and start a Chrome browser with given configurations.
-    chrome_driver = resp["data"]["webdriver"]
-    chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", resp["data"]["ws"]["selenium"])
-    driver = webdriver.Chrome(service=Service(chrome_driver), options=chrome_options)
-
-    # Memorize the primary browser window.
-    initial_window_handle = driver.current_window_handle
-    time.sleep(1.337)  # Wait for a short while.
-
-    # Close any additional browser tabs.
-    for tab in driver.window_handles:
-        if tab != initial_window_handle:
-            driver.switch_to.window(tab)
-            nugger.info("Cleaning extra tabs...")
-            driver.close()
-
-    # Go back to the primary browser window.
-    driver.switch_to.window(initial_window_handle)
-    try:
-        # Access MetaMask and input the password.
-        driver.get(METAMASK_URL)
-        input_text_if_exists(driver, '//*[@id="password"]', password)
-        # Progress through MetaMask prompts.
-        click_if_exists(driver, '//*[@id="app-content"]/div/div[3]/div/div/button')
-        time.sleep(5)
-        click_if_exists(driver, '//*[@id="app-content"]/div/div[1]/div/div[2]/div/div')
-        click_if_exists(driver, "//*[contains(text(), 'Ethereum Mainnet')]")
-        nugger.info("Logged into the wallet, switched to 'ETH' mainnet")
-
-        # Navigate to mint.fun trending feed.
-        driver.get("https://mint.fun/feed/trending")
-        time.sleep(5)
-
-        # Check if there's a need to connect the wallet and handle it.
-        element = driver.find_element(By.XPATH, '//*[@id="__next"]/div[3]/div/nav/div/div/div/button/span')
-        text = element.text
-        if text == "Connect Wallet":
-            click_if_exists(driver, '//*[@id="__next"]/div[3]/div/nav/div/div/div/button')
-            click_if_exists(driver,
-                            '//*[@id="__CONNECTKIT__"]/div/div/div/div[2]/div[2]/div[4]/div/div/div/div[1]/button[1]')
-
-            # Manage MetaMask pop-up notifications.
-            metamask_window_handle = find_metamask_notification(driver, nugger)
-            if metamask_window_handle:
-                # Interact with the MetaMask pop-up.
-                click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[3]/div[2]/button[2]')
-                click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/div[2]/footer/button[2]')
-                try:
-                    click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[3]/button[2]')
-                    click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/button[2]')
-                except Exception:
-                    math = 2 - 4
-                driver.switch_to.window(initial_window_handle)
-            else:
-                driver.switch_to.window(initial_window_handle)
-                nugger.warning("Metamask pop-up not found. System might be overloaded.")
-            nugger.info("Connected to the 'Element' page...")
-        else:
-            nugger.info("Already logged in. Skipping connection step.")
+    password = sheet.column('Password')[idx]
 
-        # Switching to the Zora network in MetaMask.
-        driver.get(METAMASK_URL)
+    with tracer.account(idx + 1), tracer.span("process_profile") as profile_span:
+        # Wait until the host can take another browser.
+        with tracer.span("admission_wait"):
+            admission.acquire()
 
-        # Navigate to the MetaMask network selection dropdown.
-        click_if_exists(driver, '//*[@id="app-content"]/div/div[1]/div/div[2]/div/div')
+        # Starting a browser session with the extracted profile ID.
         try:
-            # Wait for the interface to load before proceeding.
-            time.sleep(5)
+            with tracer.span("adspower_start"):
+                browser = adspower.start_browser(profile_id)
+        except AdsPowerError as e:
+            admission.release()
+            nugger.error(f"Failed to start a driver: {e}")
+            raise
 
-            # Attempt to select 'Zora' from the network dropdown list.
-            element = driver.find_element(By.XPATH, "//*[contains(text(), 'Zora')]")
-            element.click()
+        try:
+            result = mint_with_browser(idx + 1, browser, password, nugger)
+            profile_span.outcome = "pending" if isinstance(result, Future) else "ok"
+            return result
+        finally:
+            # Drivers whose attach failed halfway never reached the `finally` of `mint_with_browser`.
+            governor.release_account(idx + 1)
+            try:
+                adspower.stop_browser(profile_id)
+            except AdsPowerError as e:
+                nugger.warning(f"Failed to stop the browser: {e}")
+            admission.release()
+# Reports whether MetaMask is locked and which network is active, or null while the page is rendering.
+METAMASK_PROBE_JS = '''
+const password = document.getElementById('password');
+if (password) {
+    return {locked: true, network: null};
+}
+const network = document.evaluate('//*[@id="app-content"]/div/div[1]/div/div[2]/div/div', document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (network && network.textContent.trim()) {
+    return {locked: false, network: network.textContent.trim()};
+}
+return null;
+'''
+# Reports whether mint.fun is connected to the wallet, or null while the page is rendering.
+DAPP_PROBE_JS = '''
+const button = document.evaluate('//*[@id="__next"]/div[3]/div/nav/div/div/div/button/span', document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!button) {
+    return null;
+}
+return {
+    connected: button.textContent.trim() !== 'Connect Wallet',
+    chain_id: window.ethereum ? window.ethereum.chainId : null
+};
+'''
+# Address of the wallet connected to the dapp, null if there is none.
+WALLET_ADDRESS_JS = "return window.ethereum ? window.ethereum.selectedAddress || null : null;"
+# Wraps the injected provider so the hash returned for eth_sendTransaction is kept on the page.
+TX_HOOK_JS = '''
+const provider = window.ethereum;
+if (provider && !provider.__mintHooked) {
+    const request = provider.request.bind(provider);
+    window.__mintTxHashes = [];
+    provider.request = async (args) => {
+        const result = await request(args);
+        if (args && args.method === 'eth_sendTransaction') {
+            window.__mintTxHashes.push(result);
+        }
+        return result;
+    };
+    provider.__mintHooked = true;
+}
+'''
+# Returns the hash of the last transaction sent by the page, or null.
+TX_HASH_JS = "return (window.__mintTxHashes || []).slice(-1)[0] || null;"
+def probe_metamask(driver):
+    """
+    Reads the state of the MetaMask page that is currently open with one script per poll.
 
-            # Log a message indicating the switch to Zora network.
-            nugger.info("Switched to the Zora network.")
-
-        except NoSuchElementException:
-            click_if_exists(driver, "//*[contains(text(), 'Ethereum Mainnet')]")
-            # If 'Zora' is not found in the dropdown, it means the network is not added.
-            # Log a message to indicate the missing network.
-            nugger.info("Zora network isn't added. Setting it up now.")
-
-            # Navigate to MetaMask's "Add Network" settings page.
-            driver.get(f"chrome-extension://{IDENTIFICATOR}/home.html#settings/networks/add-network")
-
-            # Input required network details to add 'Zora'.
-            # These details include Network Name, New RPC URL, Chain ID, Symbol, and Block Explorer URL.
-            input_text_if_exists(driver,
-                                 '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]/div[1]/label/input',
-                                 "Zora")
-            input_text_if_exists(driver,
-                                 '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]/div[2]/label/input',
-                                 "https://rpc.zora.energy/")
-            input_text_if_exists(driver,
-                                 '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]/div[3]/label/input',
-                                 "7777777")
-            input_text_if_exists(driver,
-                                 '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]/div[4]/label/input',
-                                 "ETH")
-            input_text_if_exists(driver,
-                                 '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]/div[5]/label/input',
-                                 "https://explorer.zora.energy/")
-
-            # Wait and confirm the network addition.
-            time.sleep(2)
-            click_if_exists(driver, '/html/body/div[1]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[3]/button[2]')
-
-        # Navigate to the free Zora NFTs page.
-        nugger.info("Accessing free Zora NFTs page...")
-        driver.get("https://mint.fun/feed/free?chain=zora")
-
-        # Scroll down to load all available NFTs.
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(5)
-
-        # Fetch all the available NFT blocks.
-        blocks = driver.find_elements(By.XPATH, '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[3]/div')
-
-        # Extract links from each block, representing individual NFTs.
-        all_links = []
-        for block in blocks:
-            link_xpath = './div/div[2]/div[1]/div[1]/div/span/a'
-            links = block.find_elements(By.XPATH, link_xpath)
-            for link in links:
-                link_url = link.get_attribute('href')
-                all_links.append(link_url)
-
-        # Log how many free NFTs were found.
-        nugger.info(f"Identified {len(all_links)} NFTs available for minting.")
-
-        # Randomly select an NFT to mint.
-        selected_link = random.choice(all_links)
-        nugger.info(f"Proceeding with this collection: {selected_link}")
-
-        # Navigate to the chosen NFT's page.
-        driver.get(selected_link)
-        time.sleep(3)
-        click_if_exists(driver, '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[2]/div[3]/div[1]/button')
-
-        # Confirm the transaction in MetaMask.
-        confirm_transaction(driver, nugger)
+    Returns:
+    - dict: `locked` (bool) and `network` (label of the active network, None while locked).
+      If the page didn't render in time the wallet is assumed to be locked.
+    """
+    state = wait_until(lambda: driver.execute_script(METAMASK_PROBE_JS), PAGE_LOAD_TIMEOUT)
+    return state or {'locked': True, 'network': None}
+def probe_dapp(driver):
+    """
+    Reads whether mint.fun (any page with the navigation bar) is connected to the wallet.
+
+    Returns:
+    - dict: `connected` (bool) and `chain_id` (hex chain ID reported by the injected provider),
+      or None if the page didn't render in time.
+    """
+    return wait_until(lambda: driver.execute_script(DAPP_PROBE_JS), PAGE_LOAD_TIMEOUT)
+def unlock_metamask(driver, password, nugger):
+    """
+    Types the password into the MetaMask page that is currently open and unlocks the wallet.
+    """
+    input_text_if_exists(driver, '//*[@id="password"]', password)
+    # Progress through MetaMask prompts.
+    click_if_exists(driver, '//*[@id="app-content"]/div/div[3]/div/div/button')
+    nugger.info("Logged into the wallet")
+def switch_to_mainnet(driver, nugger):
+    """
+    Selects Ethereum Mainnet in the MetaMask page that is currently open.
+    """
+    click_if_exists(driver, '//*[@id="app-content"]/div/div[1]/div/div[2]/div/div')
+    click_if_exists(driver, "//*[contains(text(), 'Ethereum Mainnet')]")
+    nugger.info("Switched to 'ETH' mainnet")
+def connect_wallet(driver, initial_window_handle, nugger):
+    """
+    Connects MetaMask to mint.fun if the site still shows the "Connect Wallet" button.
+    """
+    # Navigate to mint.fun trending feed.
+    driver.get(TRENDING_FEED_URL)
+
+    # Check if there's a need to connect the wallet and handle it.
+    element = WebDriverWait(driver, PAGE_LOAD_TIMEOUT, poll_frequency=POLL_INTERVAL).until(
+        EC.presence_of_element_located((By.XPATH, '//*[@id="__next"]/div[3]/div/nav/div/div/div/button/span'))
+    )
+    text = element.text
+    if text == "Connect Wallet":
+        click_if_exists(driver, '//*[@id="__next"]/div[3]/div/nav/div/div/div/button')
+        known_handles = driver.window_handles
+        click_if_exists(driver,
+                        '//*[@id="__CONNECTKIT__"]/div/div/div/div[2]/div[2]/div[4]/div/div/div/div[1]/button[1]')
+
+        # Manage MetaMask pop-up notifications.
+        metamask_window_handle = find_metamask_notification(driver, nugger, known_handles)
+        if metamask_window_handle:
+            # Interact with the MetaMask pop-up.
+            click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[3]/div[2]/button[2]')
+            click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/div[2]/footer/button[2]')
+            try:
+                click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[3]/button[2]')
+                click_if_exists(driver, '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/button[2]')
+            except Exception:
+                math = 2 - 4
+            driver.switch_to.window(initial_window_handle)
+        else:
+            driver.switch_to.window(initial_window_handle)
+            nugger.warning("Metamask pop-up not found. System might be overloaded.")
+        nugger.info("Connected to the 'Element' page...")
+    else:
+        nugger.info("Already logged in. Skipping connection step.")
+def switch_to_zora(driver, nugger, zora_added=False):
+    """
+    Selects the Zora network in the MetaMask page that is currently open.
+
+    Args:
+    - zora_added (bool): The network is known to be added, so the dropdown is given the full
+      click timeout to render instead of concluding early that Zora is missing.
+
+    Returns:
+    - bool: True if Zora was selected, False if the network isn't added yet.
+    """
+    # Navigate to the MetaMask network selection dropdown.
+    click_if_exists(driver, '//*[@id="app-content"]/div/div[1]/div/div[2]/div/div')
+
+    # Attempt to select 'Zora' from the network dropdown list as soon as the list is rendered.
+    timeout = CLICK_TIMEOUT if zora_added else NETWORK_LIST_TIMEOUT
+    element = wait_for_element(driver, "//*[contains(text(), 'Zora')]", timeout)
+    if element:
+        element.click()
+
+        # Log a message indicating the switch to Zora network.
+        nugger.info("Switched to the Zora network.")
+        return True
+
+    click_if_exists(driver, "//*[contains(text(), 'Ethereum Mainnet')]")
+    return False
+def add_zora_network(driver, nugger):
+    """
+    Fills in MetaMask's "Add Network" form with the Zora network details and saves it.
+    """
+    # If 'Zora' is not found in the dropdown, it means the network is not added.
+    # Log a message to indicate the missing network.
+    nugger.info("Zora network isn't added. Setting it up now.")
+
+    # Navigate to MetaMask's "Add Network" settings page.
+    driver.get(f"chrome-extension://{IDENTIFICATOR}/home.html#settings/networks/add-network")
+
+    # Input required network details to add 'Zora' in one batch.
+    # These details include Network Name, New RPC URL, Chain ID, Symbol, and Block Explorer URL.
+    form = '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]'
+    results = batch_interact(driver, [
+        ('fill', f'{form}/div[1]/label/input', "Zora"),
+        ('fill', f'{form}/div[2]/label/input', "https://rpc.zora.energy/"),
+        ('fill', f'{form}/div[3]/label/input', "7777777"),
+        ('fill', f'{form}/div[4]/label/input', "ETH"),
+        ('fill', f'{form}/div[5]/label/input', "https://explorer.zora.energy/"),
+    ])
+    if not all(results):
+        nugger.warning(f"Some network fields could not be filled: {results}")
+
+    # Confirm the network addition once the save button becomes clickable.
+    click_if_exists(driver, '/html/body/div[1]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[3]/button[2]')
+def wait_for_mint_result(driver, nugger):
+    """
+    Polls the mint.fun toast until it reports a successful mint.
+
+    Returns:
+    - bool: True if the mint was successful.
+    """
+    toast_locator = '//*[@id="__next"]/div[2]/div/div/div/div/div[1]'
+    last_toast_text = []
+
+    def toast_reports_success():
+        text = driver.find_element(By.XPATH, toast_locator).text
+        last_toast_text[:] = [text]
+        return "successful" in text.lower()
+
+    # If successful, log a success message.
+    if wait_until(toast_reports_success, MINT_RESULT_TIMEOUT):
+        nugger.info("Minting was successful!")
+        return True
+    elif last_toast_text:
+        # If the status is unclear, log an ambiguous message.
+        nugger.error(f"Uncertain minting outcome: {last_toast_text[0]}")
+    else:
+        # If it takes too long, suggest a manual check.
+        nugger.error("Transaction took too long. Recommend checking manually.")
+    return False
+def mint_with_browser(account, browser, password, nugger):
+    """
+    Attaches a WebDriver to a started AdsPower browser and mints one free Zora NFT with it.
+
+    Steps that a probe of the current page (or a fact cached in the state store) shows to be done
+    already - unlocking, connecting mint.fun, adding and selecting Zora - are skipped.
+
+    Args:
+    - account (int): One-based index of the account.
+    - browser (dict): `data` of the AdsPower start response.
+    - password (str): MetaMask password of the profile.
+    - nugger (logging.Logger): Configured logger instance.
+
+    Returns:
+    - int: 1 if the mint was successful, or a Future of the on-chain confirmation.
+
+    Raises:
+    - MintFailed: If the transaction was not confirmed in MetaMask (WALLET) or its outcome is unknown (AMBIGUOUS).
+    """
+    with tracer.span("driver_attach"):
+        # Set up and start a Chrome browser with given configurations.
+        chrome_driver = browser["webdriver"]
+        chrome_options = Options()
+        chrome_options.add_experimental_option("debuggerAddress", browser["ws"]["selenium"])
+        driver = governor.track(account, webdriver.Chrome(service=Service(chrome_driver), options=chrome_options),
+                                chrome_driver)
+
+        # Memorize the primary browser window.
+        initial_window_handle = driver.current_window_handle
+
+        # Close any additional browser tabs.
+        for tab in driver.window_handles:
+            if tab != initial_window_handle:
+                driver.switch_to.window(tab)
+                nugger.info("Cleaning extra tabs...")
+                driver.close()
+
+        # Go back to the primary browser window.
         driver.switch_to.window(initial_window_handle)
+    try:
+        facts = store.get_facts(account)
+        # Steps an earlier attempt completed before the script died, see `resume_pending_mints`.
+        steps = store.get_steps(account)
+
+        # One probe tells which of the wallet steps are still needed on this profile.
+        driver.get(METAMASK_URL)
+        wallet = probe_metamask(driver)
+
+        with tracer.span("metamask_unlock") as span:
+            if wallet['locked']:
+                unlock_metamask(driver, password, nugger)
+                wallet = probe_metamask(driver)
+            else:
+                span.outcome = "skipped"
+                nugger.info("Wallet is already unlocked.")
+
+        with tracer.span("wallet_connect") as span:
+            if facts.get('wallet_connected') or 'network_switch' in steps:
+                # Known to be connected, the mint page checks it again anyway.
+                span.outcome = "skipped"
+            else:
+                # First run of the profile under this script: ask mint.fun whether it is connected already.
+                driver.get(TRENDING_FEED_URL)
+                dapp = probe_dapp(driver)
+                if dapp and dapp['connected']:
+                    span.outcome = "skipped"
+                    nugger.info("Already logged in. Skipping connection step.")
+                else:
+                    # Connect from Ethereum Mainnet like a fresh wallet would.
+                    driver.get(METAMASK_URL)
+                    probe_metamask(driver)
+                    switch_to_mainnet(driver, nugger)
+                    connect_wallet(driver, initial_window_handle, nugger)
+                store.set_fact(account, 'wallet_connected', 1)
+                driver.get(METAMASK_URL)
+                wallet = probe_metamask(driver)
+
+        with tracer.span("network_switch") as span:
+            if 'Zora' in (wallet['network'] or ''):
+                span.outcome = "skipped"
+                nugger.info("Zora network is already active.")
+            elif 'network_switch' in steps and wallet['network'] is None:
+                # The network can't be read (page didn't render), trust the journal of the last attempt.
+                span.outcome = "resumed"
+            elif switch_to_zora(driver, nugger, bool(facts.get('zora_added'))):
+                store.set_fact(account, 'zora_added', 1)
+            else:
+                span.outcome = "network_missing"
+                with tracer.span("network_add"):
+                    add_zora_network(driver, nugger)
+                store.set_fact(account, 'zora_added', 1)
+        store.record_step(account, 'network_switch')
+
+        with tracer.span("feed_harvest") as span:
+            if steps.get('collection'):
+                # Continue with the collection the interrupted attempt picked.
+                span.outcome = "resumed"
+                selected_link = steps['collection']
+            else:
+                # Get the free Zora collections, the feed page is only opened when the cache is stale.
+                all_links = collection_cache.get(driver, nugger)
+
+                # Randomly select an NFT to mint.
+                selected_link = random.choice(all_links)
+                store.record_step(account, 'collection', selected_link)
+            nugger.info(f"Proceeding with this collection: {selected_link}")
+
+        with tracer.span("mint_click"):
+            # Navigate to the chosen NFT's page.
+            driver.get(selected_link)
+
+            # The cached "connected" fact can be outdated, e.g. when the site was disconnected by hand.
+            dapp = probe_dapp(driver)
+            if dapp and not dapp['connected']:
+                nugger.warning("mint.fun is not connected anymore. Connecting again...")
+                connect_wallet(driver, initial_window_handle, nugger)
+                driver.get(selected_link)
+            # Remember the hash of the transaction the page is about to send.
+            driver.execute_script(TX_HOOK_JS)
+            known_handles = driver.window_handles
+            # Journaled before the click, with the nonce that tells later whether it sent anything.
+            store.record_step(account, 'mint_click', mint_click_marker(driver.execute_script(WALLET_ADDRESS_JS)))
+            click_if_exists(driver, '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[2]/div[3]/div[1]/button')
+
+        with tracer.span("confirm_transaction") as span:
+            # Confirm the transaction in MetaMask.
+            confirmed = confirm_transaction(driver, nugger, known_handles)
+            if not confirmed:
+                span.outcome = "failed"
+            driver.switch_to.window(initial_window_handle)
         nugger.info("Transaction sent. Waiting for minting confirmation...")
 
-        # Check the result of the minting process.
-        try:
-            time.sleep(10)
-            # Wait for the confirmation message.
-            element = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="__next"]/div[2]/div/div/div/div/div[1]'))
-            )
-            element_text = element.text
+        # Journal the transaction first, a restart then reconciles it instead of minting again.
+        tx_hash = wait_until(lambda: driver.execute_script(TX_HASH_JS),
+                             TX_HASH_TIMEOUT if ONCHAIN_CONFIRMATION else 1)
+        if tx_hash:
+            store.record_step(account, 'tx_sent', tx_hash)
 
-            # If successful, log a success message.
-            if "successful" in element_text.lower():
-                nugger.info("Minting was successful!")
-                driver.close()
+        # Check the result of the minting process.
+        with tracer.span("result_wait") as span:
+            if tx_hash and ONCHAIN_CONFIRMATION:
+                # The receipt is polled in the background, the browser can be released right away.
+                nugger.info(f"Transaction {tx_hash} sent. Confirming it on-chain...")
+                span.outcome = "pending"
+                return receipt_watcher.watch(tx_hash)
+            if wait_for_mint_result(driver, nugger):
                 return 1
+            if tx_hash:
+                # The toast didn't settle it, the receipt will.
+                nugger.info(f"Confirming transaction {tx_hash} on-chain instead...")
+                span.outcome = "pending"
+                return receipt_watcher.watch(tx_hash)
+            span.outcome = "failed"
+        if not confirmed:
+            raise MintFailed(WALLET, "The transaction was not confirmed in MetaMask.")
+        raise MintFailed(AMBIGUOUS, "Neither a success message nor a transaction hash, the outcome is unknown.")
+    finally:
+        # Quit, not close: close leaves the chromedriver process running.
+        governor.release(driver)
+
+
+def record_successful_mint(idx, logger):
+    """
+    Increments the mint counter of an account and records the mint in the state store.
+
+    All workers share one data frame, so the in-memory update is done under `df_lock`.
+    The store write is a single small transaction and never touches Data.xlsx.
+
+    Args:
+    - idx (int): Index of the profile (one-based, as in the data frame).
+    - logger (logging.Logger): Configured logger instance.
+
+    Returns:
+    None
+    """
+    try:
+        timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        with df_lock:
+            store.record_mint(idx, timestamp)
+            df.at[idx, 'Mint_total'] += 1
+            df.at[idx, 'Time_Stamp'] = pd.Timestamp(timestamp)
+        retry_policy.record_success(idx)
+        metrics.succeeded.inc()
+        logger.info(f"Timestamp updated for ID {idx} to {timestamp}")
+    except Exception as e:
+        logger.error(f"Error updating timestamp for ID {idx}: {e}")
+def compute_due_times(df):
+    """
+    Calculates for every account the moment it becomes eligible for its next mint, in one vectorized pass.
+
+    Args:
+    - df (pd.DataFrame): The data frame containing profile data, `Time_Stamp` parsed as datetime64.
+
+    Returns:
+    - pd.Series: Due time per account. Accounts that were never minted are due at NEVER_MINTED,
+      accounts that have already minted MAX_TRX times are NaT.
+    """
+    due_times = (df['Time_Stamp'] + pd.Timedelta(hours=MINT_COOLDOWN_HOURS)).fillna(NEVER_MINTED)
+    return due_times.mask(df['Mint_total'] >= MAX_TRX)
+def summarize_eligibility(df, now):
+    """
+    Counts finished, eligible and waiting accounts with vectorized masks.
+
+    Args:
+    - df (pd.DataFrame): The data frame containing profile data, `Time_Stamp` parsed as datetime64.
+    - now (datetime.datetime): Current time.
+
+    Returns:
+    - dict: `completed`, `eligible_now` and `waiting` counts plus `next_due`, the earliest due time
+      of the waiting accounts (None if there are none).
+    """
+    due_times = compute_due_times(df)
+    completed = due_times.isna()
+    eligible_now = due_times <= now
+    waiting = ~completed & ~eligible_now
+    next_due = due_times[waiting].min() if waiting.any() else None
+    return {
+        'completed': int(completed.sum()),
+        'eligible_now': int(eligible_now.sum()),
+        'waiting': int(waiting.sum()),
+        'next_due': next_due,
+    }
+def get_next_due_time(idx, df):
+    """
+    Calculates the moment a single account becomes eligible for its next mint.
+
+    Used to refresh one account after its row changed, see `compute_due_times` for the whole table.
+
+    Args:
+    - idx (int): Index of the profile.
+    - df (pd.DataFrame): The data frame containing profile data.
+
+    Returns:
+    - datetime.datetime: Last transaction time plus the mint cooldown, or None if the account
+      has already minted MAX_TRX times.
+    """
+    if df.at[idx, 'Mint_total'] >= MAX_TRX:
+        return None
+    last_transaction_time = df.at[idx, 'Time_Stamp']
+    if pd.isna(last_transaction_time):
+        return NEVER_MINTED.to_pydatetime()
+    return (last_transaction_time + pd.Timedelta(hours=MINT_COOLDOWN_HOURS)).to_pydatetime()
+class MintScheduler:
+    """
+    Priority queue of accounts keyed on the moment each one becomes eligible for a mint.
+
+    Every account is in the heap at most once. Accounts that are being processed are kept in
+    `in_flight` until a worker reports back through `complete`, which puts them back with their
+    new due time (or drops them once they've minted MAX_TRX times).
+    """
+
+    def __init__(self, indices, df):
+        self.df = df
+        self.in_flight = set()
+        self.condition = threading.Condition()
+        due_times = compute_due_times(df.loc[list(indices)]).dropna()
+        self.heap = [(due_time.to_pydatetime(), idx) for idx, due_time in due_times.items()]
+        heapq.heapify(self.heap)
+
+    def _push(self, idx, due_time):
+        if due_time is not None:
+            heapq.heappush(self.heap, (due_time, idx))
+
+    def is_finished(self):
+        """
+        Returns True when no account is waiting or being processed anymore.
+        """
+        return not self.heap and not self.in_flight
+
+    def next_due_time(self):
+        """
+        Returns the due time of the earliest account, or None if the heap is empty.
+        """
+        return self.heap[0][0] if self.heap else None
+
+    def take(self, idx):
+        """
+        Removes an account from the heap and marks it as in flight, e.g. while its pending
+        transaction from an earlier run is being reconciled.
+        """
+        with self.condition:
+            self.heap = [entry for entry in self.heap if entry[1] != idx]
+            heapq.heapify(self.heap)
+            self.in_flight.add(idx)
+
+    def pop_due(self, now):
+        """
+        Removes every account that is due at `now` from the heap and marks it as in flight.
+
+        Accounts that are due together are returned in random order, so the order of the
+        wallets still varies from day to day.
+
+        Args:
+        - now (datetime.datetime): Current time.
+
+        Returns:
+        - list: One-based indices of due accounts.
+        """
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, idx = heapq.heappop(self.heap)
+            self.in_flight.add(idx)
+            due.append(idx)
+        random.shuffle(due)
+        return due
+
+    def complete(self, idx, success, retry_delay=RETRY_DELAY):
+        """
+        Puts a processed account back into the heap and wakes up the dispatcher.
+
+        Args:
+        - idx (int): One-based index of the account.
+        - success (bool): Whether the mint went through.
+        - retry_delay (float): Seconds before a failed account is retried, see `retry_later`.
+
+        Returns:
+        None
+        """
+        with self.condition:
+            self.in_flight.discard(idx)
+            if success:
+                self._push(idx, get_next_due_time(idx, self.df))
             else:
-                # If the status is unclear, log an ambiguous message.
-                nugger.error(f"Uncertain minting outcome: {element_text}")
-        except TimeoutException:
-            # If it takes too long, suggest a manual check.
-            nugger.error("Transaction took too long. Recommend checking manually.")
+                self._push(idx, datetime.datetime.now() + datetime.timedelta(seconds=retry_delay))
+            self.condition.notify()
+
+    def count_due(self, now):
+        """
+        Returns how many accounts in the heap are due at `now`.
+        """
+        with self.condition:
+            return sum(1 for due_time, _ in self.heap if due_time <= now)
+
+    def is_in_flight(self, idx):
+        """
+        Returns True while an account is being processed, i.e. it was handed out and not put back yet.
+        """
+        with self.condition:
+            return idx in self.in_flight
+
+    def defer(self, idx, due_time):
+        """
+        Puts an account that was not processed back into the heap with the given due time.
+
+        Args:
+        - idx (int): One-based index of the account.
+        - due_time (datetime.datetime): When to try again, None to drop the account.
+
+        Returns:
+        None
+        """
+        with self.condition:
+            self.in_flight.discard(idx)
+            self._push(idx, due_time)
+            self.condition.notify()
+def refresh_account(idx):
+    """
+    Reloads the progress of one account from the state store, e.g. a mint another host recorded.
+    """
+    progress = store.account_progress(idx)
+    if progress:
+        with df_lock:
+            df.at[idx, 'Mint_total'] = progress[0]
+            df.at[idx, 'Time_Stamp'] = parse_timestamp(progress[1])
+def mint_click_marker(address):
+    """
+    Returns what `reconcile_mint_click` needs to tell later whether a mint click sent a transaction:
+    "address:nonce" with the pending nonce of the wallet before the click, or None if it is unknown.
+    """
+    if not address:
+        return None
+    try:
+        return f"{address}:{rpc_client.get_transaction_count(address, 'pending')}"
+    except RpcError:
+        return None
+def reconcile_mint_click(marker):
+    """
+    Tells from the nonce of the wallet whether an interrupted attempt sent its mint transaction.
+
+    Args:
+    - marker (str): Value of the `mint_click` step, see `mint_click_marker`.
+
+    Returns:
+    - str: "mined" if a transaction from the nonce of the click was mined meanwhile (these
+      wallets only send mints), "not_sent" if the nonce never moved, or None if a transaction is
+      still pending or the nonce can't be checked right now.
+    """
+    address, _, nonce = marker.rpartition(":")
+    try:
+        latest = rpc_client.get_transaction_count(address, "latest")
+        pending = rpc_client.get_transaction_count(address, "pending")
+    except RpcError:
+        return None
+    if latest > int(nonce):
+        return "mined"
+    if pending > int(nonce):
+        return None
+    return "not_sent"
+def claim_account(idx, scheduler, nugger):
+    """
+    Decides whether an account can be processed now, right before its browser is started.
+
+    With several hosts sharing the work the lease of the account is taken first; an account
+    another host is working on is deferred until that lease expires, and after the claim the
+    progress of the account is reloaded. An unfinished attempt in the step journal is reconciled
+    before anything is minted again: a journaled transaction is checked on-chain, and a mint
+    click without one is checked through the nonce of the wallet.
+
+    Args:
+    - idx (int): One-based index of the account.
+    - scheduler (MintScheduler): Scheduler the account is deferred in if it can't be processed now.
+    - nugger (logging.Logger): Configured logger instance.
+
+    Returns:
+    - bool: True if this host should process the account now.
+    """
+    if leases is not None:
+        if not leases.claim(idx):
+            holder = leases.holder(idx)
+            retry_at = datetime.datetime.fromtimestamp(holder[1]) if holder else datetime.datetime.now()
+            nugger.info(f"Account is being processed by {holder[0] if holder else 'another host'}. "
+                        f"Checking again at {retry_at:%H:%M:%S}.")
+            scheduler.defer(idx, retry_at)
+            return False
+        refresh_account(idx)
+
+    steps = store.get_steps(idx)
+    if steps.get('tx_sent'):
+        nugger.info(f"Transaction {steps['tx_sent']} of an earlier attempt was never confirmed. Checking it on-chain...")
+        receipt_watcher.watch(steps['tx_sent']).add_done_callback(
+            functools.partial(finish_onchain_mint, idx, scheduler))
+        return False
+    if 'mint_click' in steps:
+        outcome = reconcile_mint_click(steps['mint_click']) if steps['mint_click'] else "unknown"
+        if outcome == "mined":
+            nugger.warning("The wallet sent a transaction after the last mint click, counting it as the mint. "
+                           "Recommend checking the wallet manually.")
+            record_successful_mint(idx, nugger)
+            scheduler.complete(idx, True)
+            release_lease(idx)
+            return False
+        if outcome is None:
+            nugger.warning("A transaction of the last mint click may still be pending. Holding the account.")
+            retry_later(idx, scheduler, AMBIGUOUS, nugger)
+            return False
+        if outcome == "unknown":
+            nugger.warning("The last attempt clicked mint, but the nonce of the wallet was unknown. "
+                           "Recommend checking the wallet manually. Minting again...")
+        # Nothing was sent, the attempt starts from scratch.
+        store.clear_steps(idx)
+
+    if leases is None:
+        return True
+    due_time = get_next_due_time(idx, df)
+    if due_time is None or due_time > datetime.datetime.now():
+        nugger.info("Account was minted by another host meanwhile.")
+        leases.release(idx)
+        scheduler.defer(idx, due_time)
+        return False
+    return True
+def release_lease(idx):
+    if leases is not None:
+        leases.release(idx)
+def classify_failure(idx, exc):
+    """
+    Returns the failure class of an exception that ended an attempt, see `failures.classify`.
+
+    Once the mint button was clicked, a lost browser or a missing element no longer proves
+    that nothing was sent, so such failures count as AMBIGUOUS.
+    """
+    failure_class = classify(exc)
+    if failure_class in (INFRA, UI) and 'mint_click' in store.get_steps(idx):
+        return AMBIGUOUS
+    return failure_class
+def retry_later(idx, scheduler, failure_class, nugger):
+    """
+    Ends a failed attempt and schedules the account again after the backoff delay of its failure
+    class. The step journal is cleared, except for AMBIGUOUS failures: `claim_account` reconciles
+    their mint click or transaction before the account is minted again.
+
+    Args:
+    - idx (int): One-based index of the account.
+    - scheduler (MintScheduler): Scheduler the account is put back into.
+    - failure_class (str): One of INFRA, UI, WALLET and AMBIGUOUS.
+    - nugger (logging.Logger): Configured logger instance.
+
+    Returns:
+    None
+    """
+    metrics.failed.inc(failure_class)
+    delay = retry_policy.record_failure(idx, failure_class)
+    nugger.warning(f"Attempt failed ({failure_class}), retrying in {delay:.0f} seconds.")
+    try:
+        if failure_class != AMBIGUOUS:
+            # The attempt is over, the next one starts from scratch.
+            store.clear_steps(idx)
     finally:
-        try:
-            driver.close()
-        except selenium.common.exceptions.InvalidSessionIdException:
-            math = 1 - 4
-
-
-# Input the range of indices for accounts.
-start_idx = int(input("Enter the starting index: "))
-end_idx = int(input("Enter the ending index: "))
-sleep_delay = 300
-# Validate the provided indices.
-if start_idx > end_idx or start_idx < 1:
-    print("Invalid input!")
-    exit(1)
-
-# Infinite loop to continuously mint for eligible accounts.
-while True:
-    # Generate and shuffle account indices within the specified range.
-    indices = list(range(start_idx, end_idx + 1))
-    random.shuffle(indices)
-    eligible_id_found = False
-
-    for idx in indices:
-        # Initialize logger for the current index/account.
-        nugger = SetupGayLogger(f'Account {idx}')
-        total_trx = df.at[idx, 'Mint_total']
-        nugger.info("You definitely should subscribe) 'https://t.me/CryptoBub_ble'")
+        # Rescheduled even if the store is unavailable, an account left in flight is never retried.
+        scheduler.complete(idx, False, delay)
+    release_lease(idx)
+def abort_attempt(idx, scheduler, exc, nugger):
+    """
+    Ends an attempt that raised, from claiming the account to recording its mint, see `retry_later`.
 
-        # Check if the account has already minted 7 times.
-        if total_trx >= 7:
-            nugger.info(f"Account {idx} has already minted 7 times. Skipping...")
-            continue
+    Never raises: a worker that died here would take its thread down and leave the account in
+    flight forever. If the step journal can't be read (e.g. the database is locked), a mint click
+    can't be ruled out and the account is held as AMBIGUOUS.
+
+    Args:
+    - idx (int): One-based index of the account.
+    - scheduler (MintScheduler): Scheduler the account is put back into.
+    - exc (Exception): Exception that ended the attempt.
+    - nugger (logging.Logger): Configured logger instance.
 
-        # Check if it's been less than 24 hours since the last mint for this account.
-        if get_time_difference_in_hours(idx, df, nugger) < 24:
-            nugger.info(f"Less than 24 hours since last mint for Account {idx}. Skipping...")
+    Returns:
+    None
+    """
+    nugger.error(f"Error processing Account {idx}: {type(exc).__name__}: {exc}")
+    if not scheduler.is_in_flight(idx):
+        # The account was already put back before the error, e.g. while releasing its lease.
+        return
+    try:
+        failure_class = classify_failure(idx, exc)
+    except Exception as e:
+        nugger.error(f"Could not read the step journal: {type(e).__name__}: {e}")
+        failure_class = AMBIGUOUS
+    try:
+        retry_later(idx, scheduler, failure_class, nugger)
+    except Exception as e:
+        nugger.error(f"Could not clean up after the failed attempt: {type(e).__name__}: {e}")
+def circuit_pause():
+    """
+    Returns the open circuit breaker that blocks dispatch the longest and its remaining seconds,
+    or (None, 0) if AdsPower and the RPC are healthy.
+
+    Without ONCHAIN_CONFIRMATION the RPC only serves optional lookups (fee estimates, the nonce
+    marker of a mint click), so an unhealthy RPC doesn't block minting.
+    """
+    breakers = (adspower_breaker, rpc_breaker) if ONCHAIN_CONFIRMATION else (adspower_breaker,)
+    breaker = max(breakers, key=lambda b: b.retry_in())
+    seconds = breaker.retry_in()
+    return (breaker, seconds) if seconds > 0 else (None, 0)
+def hold_for_circuit(idx, scheduler, nugger):
+    """
+    Hands an account back to the scheduler untried while a circuit breaker is open.
+
+    Accounts queued before the circuit opened would otherwise still start browsers and hit the
+    unhealthy service. Holding an account is no failure of it, so nothing is counted or retried.
+
+    Args:
+    - idx (int): One-based index of the account.
+    - scheduler (MintScheduler): Scheduler the account is handed back to.
+    - nugger (logging.Logger): Logger of the account.
+
+    Returns:
+    - bool: True if the account was handed back, False if it can be processed.
+    """
+    breaker, pause = circuit_pause()
+    if breaker is None:
+        return False
+    nugger.warning(f"{breaker.name} is unhealthy, holding Account {idx} for {pause:.0f} seconds.")
+    scheduler.defer(idx, datetime.datetime.now() + datetime.timedelta(seconds=pause))
+    return True
+def finish_onchain_mint(idx, scheduler, future):
+    """
+    Records the outcome of a mint whose receipt was polled in the background.
+
+    Args:
+    - idx (int): One-based index of the account.
+    - scheduler (MintScheduler): Scheduler the result is reported to.
+    - future (Future): Receipt check, resolves to True, False or None.
+
+    Returns:
+    None
+    """
+    nugger = SetupGayLogger(f'Account {idx}')
+    confirmed = future.result()
+    try:
+        if confirmed:
+            nugger.info("Minting was confirmed on-chain!")
+            record_successful_mint(idx, nugger)
+            scheduler.complete(idx, True)
+            release_lease(idx)
+        elif confirmed is False:
+            nugger.error("Mint transaction reverted on-chain.")
+            retry_later(idx, scheduler, WALLET, nugger)
+        else:
+            if transaction_dropped(store.get_steps(idx).get('tx_sent')):
+                nugger.error("The mint transaction is unknown to the RPC, it was dropped or replaced.")
+                # Without the hash `claim_account` reconciles the mint click through the nonce of the wallet.
+                store.clear_steps(idx, 'tx_sent')
+            else:
+                # Still pending, e.g. on low gas: the hash stays journaled and is checked again later.
+                nugger.error("No receipt for the mint transaction yet. Checking it again later.")
+            retry_later(idx, scheduler, AMBIGUOUS, nugger)
+    except Exception as e:
+        # Whatever is still journaled is reconciled by the next claim of the account.
+        abort_attempt(idx, scheduler, e, nugger)
+def transaction_dropped(tx_hash):
+    """
+    Returns True if the RPC doesn't know a transaction (anymore), False if it does or can't tell.
+    """
+    try:
+        return rpc_client.get_transaction(tx_hash) is None
+    except RpcError:
+        return False
+def resume_pending_mints(scheduler, indices):
+    """
+    Reconciles transactions that were sent before the script stopped, instead of minting again.
+
+    Accounts of the range whose step journal holds a transaction hash are kept in flight while
+    their receipt is polled, then recorded like any other finished mint.
+
+    Args:
+    - scheduler (MintScheduler): Scheduler of the selected range.
+    - indices (range): One-based indices of the selected range.
+
+    Returns:
+    - int: Number of transactions being reconciled.
+    """
+    resumed = 0
+    for idx, tx_hash in store.pending_transactions():
+        if idx not in indices or (leases is not None and not leases.claim(idx)):
             continue
+        nugger = SetupGayLogger(f'Account {idx}')
+        nugger.info(f"Transaction {tx_hash} of the previous run was never confirmed. Checking it on-chain...")
+        scheduler.take(idx)
+        receipt_watcher.watch(tx_hash).add_done_callback(functools.partial(finish_onchain_mint, idx, scheduler))
+        resumed += 1
+    return resumed
+def run_worker(worker_id, account_queue, scheduler):
+    """
+    Pulls accounts from the shared queue and processes them one by one until it receives None.
 
-        # Check if all accounts have reached the max transaction limit.
-        if check_max_trx_reached(df, 7):
-            nugger.error("Max transactions reached for all accounts. Stopping process...")
-            break
+    Every call of `process_profile` starts its own AdsPower browser and attaches its own
+    WebDriver, so workers never share a browser session.
+
+    Args:
+    - worker_id (int): Number of the worker, used only for logging.
+    - account_queue (queue.Queue): Queue with one-based account indices.
+    - scheduler (MintScheduler): Scheduler the results are reported to.
+
+    Returns:
+    None
+    """
+    while True:
+        idx = account_queue.get()
+        if idx is None:
+            return
 
-        eligible_id_found = True
-        sleep_delay = 10
+        nugger = SetupGayLogger(f'Account {idx}')
+        nugger.info(f"Picked up by worker {worker_id}")
+        if hold_for_circuit(idx, scheduler, nugger):
+            continue
+        result = None
         try:
+            if not claim_account(idx, scheduler, nugger):
+                continue
+            metrics.attempted.inc()
             result = process_profile(idx - 1, nugger)  # Adjusting for zero-based indexing
-        except Exception:
-            nugger.error(f"Error processing Account {idx}")
+
+            # If minting was successful, update the records.
+            if isinstance(result, Future):
+                # The account stays in flight until its transaction is confirmed on-chain.
+                result.add_done_callback(functools.partial(finish_onchain_mint, idx, scheduler))
+            else:
+                record_successful_mint(idx, nugger)
+                scheduler.complete(idx, True)
+                release_lease(idx)
+        except Exception as e:
+            abort_attempt(idx, scheduler, e, nugger)
             continue
 
-        # If minting was successful, update the records.
-        if result == 1:
-            df.at[idx, 'Mint_total'] += 1
-            update_excel_with_timestamp(idx, DATA_PATH, df, nugger)
-            wait_duration = random.uniform(MIN_DELAY, MAX_DELAY)
+        wait_duration = random.uniform(MIN_DELAY, MAX_DELAY)
+        if isinstance(result, Future):
+            nugger.info(f"Waiting {wait_duration} seconds before next operation.")
+        else:
             nugger.info(f"Successful mint for Account {idx}. Waiting {wait_duration} seconds before next operation.")
-            time.sleep(wait_duration)
+        time.sleep(wait_duration)
+def dispatch(scheduler, workers):
+    """
+    Hands accounts to the worker pool exactly when they become eligible.
+
+    The dispatcher sleeps until the earliest due time in the scheduler (or until a worker
+    reports back) instead of rescanning the whole account range. While AdsPower or the RPC
+    keeps failing (see `circuit_pause`), nothing is dispatched until the circuit closes again.
+
+    Args:
+    - scheduler (MintScheduler): Scheduler with the accounts of the selected range.
+    - workers (int): Maximum number of browsers working at the same time.
+
+    Returns:
+    None
+    """
+    nugger = SetupGayLogger("Scheduler")
+    account_queue = queue.Queue()
+    metrics.queue_depth.set_function(account_queue.qsize)
+    threads = []
+    for worker_id in range(1, workers + 1):
+        thread = threading.Thread(target=run_worker, args=(worker_id, account_queue, scheduler),
+                                  name=f"worker-{worker_id}", daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    paused_by = None
+    while True:
+        with scheduler.condition:
+            if scheduler.is_finished():
+                break
+            breaker, pause = circuit_pause()
+            if breaker is not None:
+                if breaker is not paused_by:
+                    nugger.warning(f"Pausing dispatch: {breaker.name} is unhealthy, retrying in {pause:.0f} seconds.")
+                paused_by = breaker
+                scheduler.condition.wait(timeout=pause)
+                continue
+            paused_by = None
+            now = datetime.datetime.now()
+            due = scheduler.pop_due(now)
+            if not due:
+                next_due = scheduler.next_due_time()
+                if next_due is None:
+                    # Only in-flight accounts left, wait for a worker to report back.
+                    scheduler.condition.wait()
+                else:
+                    wait_seconds = (next_due - now).total_seconds()
+                    nugger.info(f"No eligible accounts right now. Next one is due at "
+                                f"{next_due:%Y-%m-%d %H:%M:%S}, waiting {wait_seconds:.0f} seconds...")
+                    scheduler.condition.wait(timeout=wait_seconds)
+                continue
+
+        for idx in due:
+            account_queue.put(idx)
+
+    nugger.error("Max transactions reached for all accounts. Stopping process...")
+    for _ in threads:
+        account_queue.put(None)
+    for thread in threads:
+        thread.join()
+def run(start_idx, end_idx, workers=1, engine="selenium"):
+    """
+    Mints for every account of a range as soon as it becomes eligible, until all of them are done.
+
+    Args:
+    - start_idx (int): First account of the range (one-based).
+    - end_idx (int): Last account of the range, inclusive.
+    - workers (int): Maximum number of browsers working at the same time.
+    - engine (str): "selenium" or "cdp", see `cdp_engine`.
 
-    # If no eligible account was found, increase the wait duration.
-    if not eligible_id_found:
-        sleep_delay = sleep_delay * 1.5
-        nugger.info(f"No eligible accounts found. Waiting {sleep_delay} seconds before checking again...")
-        time.sleep(sleep_delay)
+    Returns:
+    None
+    """
+    nugger = SetupGayLogger("Scheduler")
+    nugger.info("You definitely should subscribe) 'https://t.me/CryptoBub_ble'")
+
+    summary = summarize_eligibility(df.loc[start_idx:end_idx], datetime.datetime.now())
+    nugger.info(f"Accounts in range: {summary['completed']} completed, {summary['eligible_now']} eligible now, "
+                f"{summary['waiting']} waiting")
+
+    # Mint for every account of the range as soon as it becomes eligible.
+    scheduler = MintScheduler(range(start_idx, end_idx + 1), df)
+    resume_pending_mints(scheduler, range(start_idx, end_idx + 1))
+    if METRICS_PORT:
+        metrics.eligible_now.set_function(lambda: scheduler.count_due(datetime.datetime.now()))
+        metrics.in_flight.set_function(lambda: len(scheduler.in_flight))
+        metrics_server = MetricsServer(metrics, METRICS_HOST, METRICS_PORT).start()
+        nugger.info(f"Serving metrics on {metrics_server.url}")
+    governor.start()
+    try:
+        if engine == "cdp":
+            # Imported here so the Selenium flow keeps working without websockets installed.
+            from cdp_engine import CdpEngine
+            CdpEngine(sys.modules[__name__], workers).run(scheduler)
+        else:
+            dispatch(scheduler, workers)
+    finally:
+        store.compact()
+        governor.shutdown()
+        if leases is not None:
+            leases.release_all()
+def export():
+    # The workbook gets every column back, including the passwords `df` leaves out.
+    full = sheet.frame()
+    full.index = df.index
+    full['Time_Stamp'] = pd.to_datetime(full['Time_Stamp'], errors='coerce')
+    store.export_excel(full, DATA_PATH)
+    print(f"Exported progress of {len(df)} accounts to {DATA_PATH}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Daily Zora mints on mint.fun through AdsPower profiles. "
+                                                 "See cli.py for the non-interactive commands.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of AdsPower profiles processed at the same time (default: 1)")
+    parser.add_argument("--export", action="store_true",
+                        help="Regenerate Data.xlsx from the state store and exit")
+    parser.add_argument("--engine", choices=("selenium", "cdp"), default="selenium",
+                        help="selenium: one WebDriver thread per browser; cdp: all browsers driven over "
+                             "the DevTools protocol from one asyncio event loop (default: selenium)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+def main():
+    args = parse_args()
+
+    if args.export:
+        export()
+        return
+
+    # Input the range of indices for accounts.
+    start_idx = int(input("Enter the starting index: "))
+    end_idx = int(input("Enter the ending index: "))
+    # Validate the provided indices.
+    if start_idx > end_idx or start_idx < 1:
+        print("Invalid input!")
+        exit(1)
+
+    run(start_idx, end_idx, args.workers, args.engine)
+
+if __name__ == "__main__":
+    main()
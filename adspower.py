@@ -0,0 +1,252 @@
+# Standard library imports
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Third-party imports
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+ADSPOWER_URL = "http://local.adspower.net:50325"
+# The AdsPower local API rejects clients that send more than about one request per second.
+REQUESTS_PER_SECOND = 1
+REQUEST_TIMEOUT = (3, 60)
+
+
+class AdsPowerError(Exception):
+    """
+    Raised when the AdsPower local API is unreachable or answers with a non-zero code.
+    """
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1 / `rate` seconds apart.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_slot = 0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes the next slot and returns how many seconds the caller has to wait for it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        return max(0.0, wait)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdsPowerClient:
+    """
+    Client of the AdsPower local API shared by all workers.
+
+    All requests go through one keep-alive `requests.Session` with timeouts, retries on
+    connection errors and a rate limiter. Every profile started through the client is
+    remembered until it is stopped again, so `stop_all` can clean up whatever is left.
+    The outcome of every request is reported to `breaker` (see `failures.CircuitBreaker`), if given.
+    """
+
+    def __init__(self, base_url=ADSPOWER_URL, rate=REQUESTS_PER_SECOND, timeout=REQUEST_TIMEOUT, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.breaker = breaker
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        retries = Retry(total=3, connect=3, read=0, backoff_factor=0.5, allowed_methods=["GET"])
+        self.session.mount("http://", HTTPAdapter(max_retries=retries, pool_maxsize=32))
+        self.started = set()
+        self.lock = threading.Lock()
+
+    def _call(self, path, **params):
+        self.limiter.acquire()
+        try:
+            resp = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout).json()
+            if resp.get("code") != 0:
+                raise AdsPowerError(resp.get("msg", f"AdsPower API request {path} failed"))
+        except (requests.RequestException, ValueError) as e:
+            if self.breaker:
+                self.breaker.record_failure()
+            raise AdsPowerError(f"AdsPower API request {path} failed: {e}") from e
+        except AdsPowerError:
+            if self.breaker:
+                self.breaker.record_failure()
+            raise
+        if self.breaker:
+            self.breaker.record_success()
+        return resp.get("data") or {}
+
+    def start_browser(self, profile_id):
+        """
+        Starts the browser of a profile.
+
+        Args:
+        - profile_id (str): AdsPower profile ID.
+
+        Returns:
+        - dict: The `data` part of the response (`ws` addresses and `webdriver` path).
+        """
+        data = self._call("/api/v1/browser/start", user_id=profile_id)
+        with self.lock:
+            self.started.add(profile_id)
+        return data
+
+    def stop_browser(self, profile_id):
+        """
+        Stops the browser of a profile. The profile is only forgotten once it is stopped, so
+        `stop_all` retries a profile whose stop request failed.
+
+        Args:
+        - profile_id (str): AdsPower profile ID.
+
+        Returns:
+        None
+
+        Raises:
+        - AdsPowerError: If the request failed and the browser may still be running.
+        """
+        try:
+            self._call("/api/v1/browser/stop", user_id=profile_id)
+        except AdsPowerError:
+            # A browser that was closed by hand can't be stopped, but needs no stopping either.
+            try:
+                running = self.browser_status(profile_id)
+            except AdsPowerError:
+                running = True
+            if running:
+                raise
+        with self.lock:
+            self.started.discard(profile_id)
+
+    def browser_status(self, profile_id):
+        """
+        Checks whether the browser of a profile is running.
+
+        Args:
+        - profile_id (str): AdsPower profile ID.
+
+        Returns:
+        - bool: True if AdsPower reports the browser as active.
+        """
+        data = self._call("/api/v1/browser/active", user_id=profile_id)
+        return data.get("status") == "Active"
+
+    def stop_all(self):
+        """
+        Stops every profile that was started through this client and not stopped yet.
+
+        Returns:
+        - list: Profile IDs that could not be stopped.
+        """
+        with self.lock:
+            profile_ids = list(self.started)
+        failed = []
+        for profile_id in profile_ids:
+            try:
+                self.stop_browser(profile_id)
+            except AdsPowerError:
+                failed.append(profile_id)
+        return failed
+
+
+class AdsPowerStubServer:
+    """
+    Minimal local imitation of the AdsPower local API for offline testing.
+
+    It answers `browser/start`, `browser/stop` and `browser/active` like AdsPower does and keeps
+    track of the running profiles. Profiles listed in `failing_profiles` can't be started.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, failing_profiles=(), debugger_address="127.0.0.1:9222",
+                 webdriver_path="chromedriver"):
+        self.failing_profiles = set(failing_profiles)
+        self.debugger_address = debugger_address
+        self.webdriver_path = webdriver_path
+        self.active = set()
+        self.calls = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, path, profile_id):
+        with self.lock:
+            self.calls.append((path, profile_id))
+            if path == "/api/v1/browser/start":
+                if profile_id in self.failing_profiles:
+                    return {"code": -1, "msg": f"Failed to start profile {profile_id}"}
+                self.active.add(profile_id)
+                return {"code": 0, "msg": "success", "data": {
+                    "ws": {"selenium": self.debugger_address,
+                           "puppeteer": f"ws://{self.debugger_address}/devtools/browser/{profile_id}"},
+                    "debug_port": self.debugger_address.rsplit(":", 1)[-1],
+                    "webdriver": self.webdriver_path,
+                }}
+            if path == "/api/v1/browser/stop":
+                self.active.discard(profile_id)
+                return {"code": 0, "msg": "success"}
+            if path == "/api/v1/browser/active":
+                status = "Active" if profile_id in self.active else "Inactive"
+                return {"code": 0, "msg": "success", "data": {"status": status}}
+        return {"code": -1, "msg": "Unknown endpoint"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                profile_id = parse_qs(url.query).get("user_id", [None])[0]
+                body = json.dumps(stub.handle(url.path, profile_id)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Run the stub on the AdsPower port, so the script can be pointed at it with ADSPOWER_URL.
+    stub = AdsPowerStubServer(port=50325).start()
+    print(f"AdsPower stub listening on {stub.url}")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
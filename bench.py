@@ -0,0 +1,423 @@
+"""
+Offline benchmark of the mint loop.
+
+Runs the real scheduler, worker pool and mint flow of Skript.py against a simulated WebDriver
+and the AdsPower stub server, in a temporary directory with a synthetic Data.xlsx. Nothing
+touches a real browser, wallet or the Data.xlsx of the repository.
+
+    python bench.py --rows 5000 --accounts 200 --workers 8
+"""
+# Standard library imports
+import argparse
+import datetime
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+
+# Third-party imports
+import pandas as pd
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+# Local imports
+from adspower import AdsPowerStubServer
+from tracing import print_summary
+from zora_rpc import RpcStubServer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Clicks on these locators make the dapp open a MetaMask Notification window.
+POPUP_TRIGGERS = ('__CONNECTKIT__', '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[2]/div[3]/div[1]/button')
+TOAST_LOCATOR = '//*[@id="__next"]/div[2]/div/div/div/div/div[1]'
+CONNECT_LOCATOR = '//*[@id="__next"]/div[3]/div/nav/div/div/div/button/span'
+
+
+class BenchStats:
+    """
+    Counters shared by all simulated drivers and the instrumented parts of Skript.py.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.simulated_latency = 0.0
+        self.wait_time = 0.0
+        self.state_writes = []
+        self.faults = {'stale': 0, 'timeout': 0}
+        self.drivers = 0
+
+    def add(self, name, value):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def fault(self, kind):
+        with self.lock:
+            self.faults[kind] += 1
+
+
+class FakeElement:
+    def __init__(self, driver, locator):
+        self.driver = driver
+        self.locator = locator
+
+    @property
+    def text(self):
+        return self.driver.text_of(self.locator)
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.driver.click(self.locator)
+
+    def clear(self):
+        self.driver.latency('find_element')
+
+    def send_keys(self, keys):
+        self.driver.latency('find_element')
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        if handle not in self.driver.window_handles:
+            raise NoSuchElementException(f"No window {handle}")
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """
+    Simulated Selenium WebDriver that models the pages the mint flow visits.
+
+    Every call sleeps for the configured latency of its kind. Pop-ups appear as new window handles
+    after `window` seconds, the mint toast reports success `result` seconds after the confirmation.
+    Faults are injected per page load: a missing element (the caller runs into its timeout) or a
+    stale element on click.
+    """
+
+    def __init__(self, config, stats):
+        self.config = config
+        self.stats = stats
+        self.rng = random.Random(config['seed'] + id(self))
+        self.current_window_handle = 'main'
+        self.handles = {'main': 0.0}
+        self.titles = {'main': 'New Tab'}
+        self.switch_to = FakeSwitchTo(self)
+        self.url = 'about:blank'
+        self.page_load = 0
+        self.missing = {}
+        self.popups = 0
+        self.toast_at = None
+        self.toast_text = None
+        self.tx_hash = None
+        self.connected = self.rng.random() > config['cold_profile_rate']
+        self.zora_added = self.rng.random() > config['zora_missing_rate']
+        self.locked = self.rng.random() < config['locked_rate']
+        self.network = 'Zora' if self.zora_added and self.rng.random() < 0.5 else 'Ethereum Mainnet'
+        stats.add('drivers', 1)
+
+    def latency(self, kind):
+        delay = self.config['latency'][kind] * self.rng.uniform(0.5, 1.5)
+        self.stats.add('simulated_latency', delay)
+        time.sleep(delay)
+
+    @property
+    def window_handles(self):
+        now = time.monotonic()
+        return [handle for handle, appears_at in self.handles.items() if appears_at <= now]
+
+    @property
+    def title(self):
+        return self.titles[self.current_window_handle]
+
+    def get(self, url):
+        self.latency('get')
+        self.url = url
+        self.page_load += 1
+        self.missing = {}
+
+    def close(self):
+        self.handles.pop(self.current_window_handle, None)
+
+    def quit(self):
+        self.handles.clear()
+
+    def is_missing(self, locator):
+        # Decided once per page load, so polling the locator again doesn't make it appear.
+        if locator not in self.missing:
+            self.missing[locator] = self.rng.random() < self.config['timeout_rate']
+            if self.missing[locator]:
+                self.stats.fault('timeout')
+        return self.missing[locator]
+
+    def find_element(self, by, locator):
+        self.latency('find_element')
+        if locator == TOAST_LOCATOR and (self.toast_at is None or time.monotonic() < self.toast_at):
+            raise NoSuchElementException(locator)
+        if "'Zora'" in locator and not self.zora_added:
+            raise NoSuchElementException(locator)
+        if self.is_missing(locator):
+            raise NoSuchElementException(locator)
+        return FakeElement(self, locator)
+
+    def find_elements(self, by, locator):
+        try:
+            return [self.find_element(by, locator)]
+        except NoSuchElementException:
+            return []
+
+    def text_of(self, locator):
+        if locator == CONNECT_LOCATOR:
+            return "0x1234...abcd" if self.connected else "Connect Wallet"
+        if locator == TOAST_LOCATOR:
+            return self.toast_text
+        return ""
+
+    def click(self, locator):
+        self.latency('find_element')
+        if self.rng.random() < self.config['stale_rate']:
+            self.stats.fault('stale')
+            raise StaleElementReferenceException(locator)
+        self.click_effects(locator)
+
+    def click_effects(self, locator):
+        if any(trigger in locator for trigger in POPUP_TRIGGERS):
+            self.open_popup()
+        if 'add-network' in self.url:
+            self.zora_added = True
+        if locator == '//*[@id="app-content"]/div/div[3]/div/div/button':
+            self.locked = False
+        elif "'Zora'" in locator:
+            self.network = 'Zora'
+        elif "'Ethereum Mainnet'" in locator:
+            self.network = 'Ethereum Mainnet'
+
+    def batch(self, actions, require_all):
+        found = [not self.is_missing(action[1]) for action in actions]
+        if require_all and not all(found):
+            return None
+        results = [None] * len(actions)
+        for i, (action, present) in enumerate(zip(actions, found)):
+            results[i] = present
+            if not present:
+                # Like BATCH_JS, the batch stops at the first action that failed.
+                break
+            if action[0] == 'click':
+                self.click_effects(action[1])
+        return results
+
+    def open_popup(self):
+        self.popups += 1
+        handle = f'notification-{self.popups}'
+        self.handles[handle] = time.monotonic() + self.config['latency']['window'] * self.rng.uniform(0.5, 1.5)
+        self.titles[handle] = 'MetaMask Notification'
+
+    def execute_script(self, script, *args):
+        self.latency('execute_script')
+        if "getElementById('password')" in script:
+            return {'locked': self.locked, 'network': None if self.locked else self.network}
+        if 'chain_id' in script:
+            return {'connected': self.connected, 'chain_id': '0x76adf1' if self.network == 'Zora' else '0x1'}
+        if 'HTMLInputElement.prototype' in script:
+            return self.batch(*args)
+        if 'XPathResult' in script:
+            return [f"https://mint.fun/zora/0x{n:040x}" for n in range(25)]
+        if 'page-container-footer-next' in script:
+            return FakeElement(self, 'confirm')
+        if script.startswith('arguments[0].click()'):
+            self.confirm()
+        if '__mintTxHashes || []' in script:
+            return self.tx_hash
+        return None
+
+    def confirm(self):
+        # MetaMask closes the notification and the dapp shows the result after a while.
+        self.handles.pop(self.current_window_handle, None)
+        self.connected = True
+        self.toast_at = time.monotonic() + self.config['latency']['result'] * self.rng.uniform(0.5, 1.5)
+        failed = self.rng.random() < self.config['mint_failure_rate']
+        self.toast_text = "Transaction failed" if failed else "Mint successful!"
+        if self.config['rpc_stub']:
+            self.tx_hash = f"0x{self.rng.getrandbits(256):064x}"
+            self.config['rpc_stub'].add_transaction(self.tx_hash, self.toast_at - time.monotonic(), 0 if failed else 1)
+
+
+def write_synthetic_data(path, rows, accounts):
+    """
+    Writes a Data.xlsx with `rows` accounts; the first `accounts` are one mint away from being done.
+    """
+    last_mint = datetime.datetime.now() - datetime.timedelta(days=2)
+    pd.DataFrame({
+        'Profile ID': [f"bench{n:06d}" for n in range(1, rows + 1)],
+        'Password': [f"password{n:06d}" for n in range(1, rows + 1)],
+        'Mint_total': [6 if n <= accounts else 7 for n in range(1, rows + 1)],
+        'Time_Stamp': [last_mint.strftime("%Y-%m-%d %H:%M:%S")] * rows,
+    }).to_excel(path, index=False)
+
+
+def instrument(skript, stats, config):
+    """
+    Points Skript.py at the simulated backends and wraps the parts whose cost is reported.
+    """
+    skript.webdriver = types.SimpleNamespace(Chrome=lambda service, options: FakeDriver(config, stats))
+    skript.Service = lambda path: path
+
+    wait_until = skript.wait_until
+
+    def timed_wait_until(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return wait_until(*args, **kwargs)
+        finally:
+            stats.add('wait_time', time.perf_counter() - start)
+
+    skript.wait_until = timed_wait_until
+
+    record_mint = skript.store.record_mint
+
+    def timed_record_mint(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return record_mint(*args, **kwargs)
+        finally:
+            with stats.lock:
+                stats.state_writes.append(time.perf_counter() - start)
+
+    skript.store.record_mint = timed_record_mint
+
+    # Scale the UI deadlines down, a missing element should cost seconds, not minutes.
+    for name in ('PAGE_LOAD_TIMEOUT', 'CLICK_TIMEOUT', 'INPUT_TIMEOUT', 'NETWORK_LIST_TIMEOUT',
+                 'NOTIFICATION_TIMEOUT', 'MINT_RESULT_TIMEOUT'):
+        setattr(skript, name, getattr(skript, name) * config['timeout_scale'])
+    # The backoff of the first UI failure takes `retry_delay`, the other delays scale alongside.
+    skript.retry_policy.scale = config['retry_delay'] / skript.retry_policy.policies[skript.UI][0]
+
+
+def run_benchmark(args):
+    config = {
+        'seed': args.seed,
+        'latency': {'get': args.get_latency, 'find_element': args.find_latency,
+                    'execute_script': args.script_latency, 'window': args.window_latency,
+                    'result': args.result_latency},
+        'stale_rate': args.stale_rate,
+        'timeout_rate': args.timeout_rate,
+        'mint_failure_rate': args.mint_failure_rate,
+        'cold_profile_rate': args.cold_profile_rate,
+        'zora_missing_rate': args.zora_missing_rate,
+        'locked_rate': args.locked_rate,
+        'timeout_scale': args.timeout_scale,
+        'retry_delay': args.retry_delay,
+    }
+    stats = BenchStats()
+    random.seed(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="mintfun-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    write_synthetic_data("Data.xlsx", args.rows, args.accounts)
+
+    with AdsPowerStubServer() as adspower_stub, RpcStubServer() as rpc_stub:
+        config['rpc_stub'] = rpc_stub if args.onchain else None
+        with open("config_user.json", "w") as f:
+            json.dump({
+                'IDENTIFICATOR': "benchbenchbenchbenchbenchbenchbe",
+                'MIN_DELAY': 0,
+                'MAX_DELAY': 0,
+                'ADSPOWER_URL': adspower_stub.url,
+                'ADSPOWER_RATE': 0,
+                'RAINBOW_CONSOLE': False,
+                'LOG_JSON_PATH': "log.jsonl",
+                'ONCHAIN_CONFIRMATION': args.onchain,
+                'ZORA_RPC_URL': rpc_stub.url,
+            }, f)
+
+        start = time.perf_counter()
+        skript = importlib.import_module("Skript")
+        startup = time.perf_counter() - start
+        instrument(skript, stats, config)
+
+        start = time.perf_counter()
+        scheduler = skript.MintScheduler(range(1, args.accounts + 1), skript.df)
+        scheduling = time.perf_counter() - start
+
+        start = time.perf_counter()
+        skript.dispatch(scheduler, args.workers)
+        elapsed = time.perf_counter() - start
+        leaked_browsers = len(adspower_stub.active)
+
+    # The pre-journal approach rewrote the whole workbook after every mint.
+    start = time.perf_counter()
+    skript.df.to_excel("rewrite.xlsx", index=False)
+    workbook_rewrite = time.perf_counter() - start
+
+    writes = stats.state_writes
+    report = {
+        'rows': args.rows,
+        'accounts': args.accounts,
+        'workers': args.workers,
+        'startup_s': round(startup, 3),
+        'scheduler_build_s': round(scheduling, 4),
+        'elapsed_s': round(elapsed, 2),
+        'accounts_per_hour': round(args.accounts / elapsed * 3600, 1),
+        'browsers_started': stats.drivers,
+        'browsers_left_running': leaked_browsers,
+        'wait_time_s': round(stats.wait_time, 2),
+        'simulated_ui_latency_s': round(stats.simulated_latency, 2),
+        'faults': stats.faults,
+        'state_writes': len(writes),
+        'state_write_mean_ms': round(sum(writes) / len(writes) * 1000, 3) if writes else None,
+        'state_write_max_ms': round(max(writes) * 1000, 3) if writes else None,
+        'workbook_rewrite_ms': round(workbook_rewrite * 1000, 1),
+        'workdir': workdir,
+    }
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark of the mint loop.")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows of the synthetic Data.xlsx")
+    parser.add_argument("--accounts", type=int, default=200, help="Accounts to mint for (first N rows)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--get-latency", type=float, default=0.2, help="Seconds per driver.get")
+    parser.add_argument("--find-latency", type=float, default=0.01, help="Seconds per find_element/click")
+    parser.add_argument("--script-latency", type=float, default=0.01, help="Seconds per execute_script")
+    parser.add_argument("--window-latency", type=float, default=0.5, help="Seconds until a pop-up appears")
+    parser.add_argument("--result-latency", type=float, default=2.0, help="Seconds until the mint toast")
+    parser.add_argument("--stale-rate", type=float, default=0.01, help="Probability of a stale element on click")
+    parser.add_argument("--timeout-rate", type=float, default=0.002,
+                        help="Probability of an element missing for a whole page load")
+    parser.add_argument("--mint-failure-rate", type=float, default=0.02)
+    parser.add_argument("--cold-profile-rate", type=float, default=0.2,
+                        help="Share of profiles that still need to connect the wallet")
+    parser.add_argument("--zora-missing-rate", type=float, default=0.1,
+                        help="Share of profiles without the Zora network")
+    parser.add_argument("--locked-rate", type=float, default=0.5,
+                        help="Share of profiles whose MetaMask is locked when the browser starts")
+    parser.add_argument("--timeout-scale", type=float, default=0.1, help="Factor applied to the UI deadlines")
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="Seconds before a failed account is retried")
+    parser.add_argument("--onchain", action="store_true",
+                        help="Confirm mints through the RPC stub instead of the mint.fun toast")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmark(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:<24}{value}")
+        print()
+        print_summary(os.path.join(report['workdir'], "trace.jsonl"))
@@ -0,0 +1,649 @@
+"""
+asyncio engine that drives the AdsPower browsers over the Chrome DevTools Protocol.
+
+Instead of one thread and one chromedriver process per browser, every profile is a coroutine
+that talks to its browser through the DevTools websocket AdsPower returns on start
+(`data.ws.puppeteer`). The flow is the same as `process_profile`/`confirm_transaction` in
+Skript.py and shares its scheduler, state store, tracer, caches and page scripts.
+
+Started from Skript.py with `--engine cdp`.
+"""
+# Standard library imports
+import asyncio
+import datetime
+import functools
+import itertools
+import json
+import random
+import time
+from concurrent.futures import Future
+
+# Third-party imports
+import websockets
+
+# Local imports
+from failures import AMBIGUOUS, INFRA, UI, WALLET, MintFailed
+
+# Seconds between scheduler checks while accounts are in flight outside of the event loop.
+IDLE_CHECK_INTERVAL = 5
+
+# Locators of the MetaMask and mint.fun pages, identical to the ones of the Selenium flow.
+PASSWORD_INPUT = '//*[@id="password"]'
+UNLOCK_BUTTON = '//*[@id="app-content"]/div/div[3]/div/div/button'
+NETWORK_DROPDOWN = '//*[@id="app-content"]/div/div[1]/div/div[2]/div/div'
+MAINNET_OPTION = "//*[contains(text(), 'Ethereum Mainnet')]"
+ZORA_OPTION = "//*[contains(text(), 'Zora')]"
+NAV_BUTTON = '//*[@id="__next"]/div[3]/div/nav/div/div/div/button'
+CONNECTKIT_METAMASK = '//*[@id="__CONNECTKIT__"]/div/div/div/div[2]/div[2]/div[4]/div/div/div/div[1]/button[1]'
+CONNECT_POPUP_BUTTONS = [
+    '//*[@id="app-content"]/div/div[2]/div/div[3]/div[2]/button[2]',
+    '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/div[2]/footer/button[2]',
+    '//*[@id="app-content"]/div/div[2]/div/div[2]/div[3]/button[2]',
+    '//*[@id="app-content"]/div/div[2]/div/div[2]/div[2]/button[2]',
+]
+NETWORK_FORM = '//*[@id="app-content"]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[2]'
+NETWORK_SAVE_BUTTON = '/html/body/div[1]/div/div[3]/div/div[2]/div[2]/div/div[2]/div/div[3]/button[2]'
+MINT_BUTTON = '//*[@id="__next"]/div[3]/div/main/div/div[2]/div[2]/div[3]/div[1]/button'
+EDIT_GAS_BUTTON = '//*[@id="app-content"]/div/div[2]/div/div[5]/div[2]/div/div/div/div[1]/button'
+ADVANCED_GAS_BUTTON = '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/button'
+# Max base fee and priority fee of the advanced gas form.
+GAS_INPUTS = [
+    '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[2]/label/div[2]/input',
+    '//*[@id="popover-content"]/div/div/section/div[2]/div/div[2]/div[1]/div[3]/div[3]/label/div[2]/input',
+]
+GAS_SAVE_BUTTON = '//*[@id="popover-content"]/div/div/section/div[3]/button'
+TOAST = '//*[@id="__next"]/div[2]/div/div/div/div/div[1]'
+
+# Clicks an element once it exists, is visible and enabled; returns false until then.
+CLICK_JS = '''
+const element = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!element || element.disabled || !element.getClientRects().length) {
+    return false;
+}
+element.click();
+return true;
+'''
+# Focuses an input and selects its content, so Input.insertText replaces it.
+FOCUS_JS = '''
+const element = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!element) {
+    return false;
+}
+element.focus();
+element.select();
+return true;
+'''
+# Returns the text of the mint.fun toast once it reports a successful mint.
+TOAST_JS = '''
+const element = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return element && element.textContent.toLowerCase().includes('successful') ? element.textContent : null;
+'''
+# Reports whether MetaMask's confirm button exists and clicks it when arguments[0] is true.
+CONFIRM_JS = '''
+const button = document.querySelector('[data-testid="page-container-footer-next"]');
+if (!button) {
+    return false;
+}
+if (arguments[0]) {
+    button.click();
+}
+return true;
+'''
+
+
+class CdpError(Exception):
+    """
+    Raised when a DevTools command fails or a page script throws.
+    """
+    failure_class = UI
+
+
+class CdpConnectionError(CdpError):
+    """
+    Raised when the DevTools connection to the browser is lost.
+    """
+    failure_class = INFRA
+
+
+class CdpBrowser:
+    """
+    One DevTools websocket connection to a browser, multiplexing the sessions of its pages.
+    """
+
+    def __init__(self, ws_url, command_timeout=30):
+        self.ws_url = ws_url
+        self.command_timeout = command_timeout
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.ws = None
+        self.reader = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.ws_url, max_size=None, ping_interval=None)
+        self.reader = asyncio.create_task(self._read())
+        return self
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        if self.ws:
+            await self.ws.close()
+
+    async def _read(self):
+        try:
+            async for message in self.ws:
+                message = json.loads(message)
+                future = self.pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    # Events are not needed, pages are polled instead.
+                    continue
+                if "error" in message:
+                    future.set_exception(CdpError(message["error"].get("message", message["error"])))
+                else:
+                    future.set_result(message.get("result", {}))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CdpConnectionError("DevTools connection closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None, session_id=None):
+        """
+        Sends a DevTools command and waits for its result.
+
+        Args:
+        - method (str): Command, e.g. "Runtime.evaluate".
+        - params (dict): Parameters of the command.
+        - session_id (str): Session of the page the command is meant for, None for the browser.
+
+        Returns:
+        - dict: `result` of the response.
+        """
+        command_id = next(self.ids)
+        message = {"id": command_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[command_id] = future
+        try:
+            await self.ws.send(json.dumps(message))
+        except websockets.ConnectionClosed as e:
+            self.pending.pop(command_id, None)
+            raise CdpConnectionError(f"DevTools connection closed: {e}") from e
+        try:
+            return await asyncio.wait_for(future, self.command_timeout)
+        finally:
+            self.pending.pop(command_id, None)
+
+    async def pages(self):
+        targets = (await self.send("Target.getTargets"))["targetInfos"]
+        return [target for target in targets if target["type"] == "page"]
+
+    async def attach(self, target_id):
+        result = await self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        page = CdpPage(self, target_id, result["sessionId"])
+        await page.send("Runtime.enable")
+        return page
+
+    async def close_target(self, target_id):
+        await self.send("Target.closeTarget", {"targetId": target_id})
+
+    async def wait_for_new_page(self, known_ids, title, timeout, interval):
+        """
+        Polls the page targets until one that is not in `known_ids` has `title` in its title.
+
+        Returns:
+        - dict: Target info, or None after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            for target in await self.pages():
+                if target["targetId"] not in known_ids and title in target.get("title", ""):
+                    return target
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(interval)
+
+    async def target_exists(self, target_id):
+        return any(target["targetId"] == target_id for target in await self.pages())
+
+
+class CdpPage:
+    """
+    A page (tab or extension window) of a browser, reached through its flattened session.
+    """
+
+    def __init__(self, browser, target_id, session_id, poll_interval=0.25):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.poll_interval = poll_interval
+
+    async def send(self, method, params=None):
+        return await self.browser.send(method, params, self.session_id)
+
+    async def evaluate(self, body, *args):
+        """
+        Runs a function body written for Selenium's `execute_script` (it may use `arguments`
+        and `return`) and returns its JSON value.
+        """
+        expression = f"(function() {{{body}}}).apply(null, {json.dumps(args)})"
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True})
+        if "exceptionDetails" in result:
+            raise CdpError(result["exceptionDetails"].get("text", "Page script failed"))
+        return result["result"].get("value")
+
+    async def wait_for(self, body, timeout, *args):
+        """
+        Polls a page script until it returns something truthy, or None after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = await self.evaluate(body, *args)
+            except CdpConnectionError:
+                raise
+            except CdpError:
+                # The page is navigating, the execution context will be back shortly.
+                value = None
+            if value:
+                return value
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def navigate(self, url, timeout):
+        await self.send("Page.navigate", {"url": url})
+        await self.wait_for("return document.readyState === 'complete';", timeout)
+
+    async def click(self, locator, timeout):
+        return bool(await self.wait_for(CLICK_JS, timeout, locator))
+
+    async def type(self, locator, text, timeout):
+        """
+        Replaces the content of an input with `text` in one Input.insertText command.
+        """
+        if not await self.wait_for(FOCUS_JS, timeout, locator):
+            return False
+        await self.send("Input.insertText", {"text": text})
+        return True
+
+    async def batch(self, batch_js, actions, timeout):
+        """
+        Counterpart of `Skript.batch_interact`: runs all actions in one evaluation once every locator
+        exists. From the first action that failed on, the actions are retried one by one, in order,
+        until one of them fails again.
+
+        Returns:
+        - list: True/False per action; False also for actions that were not run.
+        """
+        results = await self.wait_for(batch_js, timeout, actions, True)
+        if results is None:
+            results = await self.evaluate(batch_js, actions, False)
+        for i, action in enumerate(actions):
+            if results[i]:
+                continue
+            if action[0] == 'fill':
+                results[i] = await self.type(action[1], action[2], timeout)
+            else:
+                results[i] = await self.click(action[1], timeout)
+            if not results[i]:
+                break
+        return [bool(result) for result in results]
+
+
+class CdpEngine:
+    """
+    Runs the mint flow for many accounts from one event loop.
+
+    Args:
+    - skript (module): The running Skript.py module; its scheduler helpers, state store, tracer,
+      caches, page scripts and configuration are shared with the Selenium flow.
+    - concurrency (int): Maximum number of browsers driven at the same time.
+    """
+
+    def __init__(self, skript, concurrency):
+        self.skript = skript
+        self.concurrency = concurrency
+        self.harvest_lock = None
+
+    def run(self, scheduler):
+        asyncio.run(self.dispatch(scheduler))
+
+    async def dispatch(self, scheduler):
+        """
+        Async counterpart of `Skript.dispatch`: starts a task per due account, bounded by a semaphore.
+        """
+        skript = self.skript
+        nugger = skript.SetupGayLogger("Scheduler")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self.harvest_lock = asyncio.Lock()
+        tasks = set()
+        paused_by = None
+
+        while True:
+            breaker, pause = skript.circuit_pause()
+            if breaker is not None:
+                if breaker is not paused_by:
+                    nugger.warning(f"Pausing dispatch: {breaker.name} is unhealthy, retrying in {pause:.0f} seconds.")
+                paused_by = breaker
+                await asyncio.sleep(pause)
+                continue
+            paused_by = None
+            with scheduler.condition:
+                if scheduler.is_finished():
+                    break
+                now = datetime.datetime.now()
+                due = scheduler.pop_due(now)
+                next_due = scheduler.next_due_time()
+
+            for idx in due:
+                task = asyncio.create_task(self.run_account(idx, scheduler, semaphore, loop, wakeup))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if due:
+                continue
+            # Sleep until the next account is due or a task/receipt reports back.
+            timeout = None if next_due is None else max(0.0, (next_due - datetime.datetime.now()).total_seconds())
+            if next_due is not None and not tasks:
+                nugger.info(f"No eligible accounts right now. Next one is due at "
+                            f"{next_due:%Y-%m-%d %H:%M:%S}, waiting {timeout:.0f} seconds...")
+            if scheduler.in_flight:
+                # Receipts of earlier attempts report to the scheduler from other threads, not to `wakeup`.
+                timeout = IDLE_CHECK_INTERVAL if timeout is None else min(timeout, IDLE_CHECK_INTERVAL)
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+        nugger.error("Max transactions reached for all accounts. Stopping process...")
+
+    async def run_account(self, idx, scheduler, semaphore, loop, wakeup):
+        skript = self.skript
+        nugger = skript.SetupGayLogger(f'Account {idx}')
+        metrics = skript.metrics
+        metrics.queue_depth.inc()
+        async with semaphore:
+            metrics.queue_depth.dec()
+            if skript.hold_for_circuit(idx, scheduler, nugger):
+                wakeup.set()
+                return
+            try:
+                # Claimed only once a slot is free, like a worker thread does when it picks the account up,
+                # so a busy host doesn't hold the leases of accounts an idle host could process.
+                if not await asyncio.to_thread(skript.claim_account, idx, scheduler, nugger):
+                    wakeup.set()
+                    return
+                metrics.attempted.inc()
+                result = await self.process_profile(idx, nugger)
+            except Exception as e:
+                await asyncio.to_thread(skript.abort_attempt, idx, scheduler, e, nugger)
+                wakeup.set()
+                return
+
+        try:
+            if isinstance(result, Future):
+                result.add_done_callback(functools.partial(skript.finish_onchain_mint, idx, scheduler))
+                result.add_done_callback(lambda _: loop.call_soon_threadsafe(wakeup.set))
+            else:
+                skript.record_successful_mint(idx, nugger)
+                scheduler.complete(idx, True)
+                skript.release_lease(idx)
+        except Exception as e:
+            skript.abort_attempt(idx, scheduler, e, nugger)
+        wakeup.set()
+
+        wait_duration = random.uniform(skript.MIN_DELAY, skript.MAX_DELAY)
+        nugger.info(f"Waiting {wait_duration} seconds before next operation.")
+        await asyncio.sleep(wait_duration)
+
+    async def process_profile(self, idx, nugger):
+        """
+        Starts the AdsPower browser of an account, runs the mint flow over CDP and always stops it.
+        """
+        skript = self.skript
+        tracer = skript.tracer
+        profile_id = skript.profiles[idx - 1]
+        password = skript.sheet.column('Password')[idx - 1]
+
+        with tracer.span("process_profile", idx) as profile_span:
+            with tracer.span("admission_wait", idx):
+                await skript.admission.acquire_async()
+            try:
+                with tracer.span("adspower_start", idx):
+                    browser_data = await asyncio.to_thread(skript.adspower.start_browser, profile_id)
+            except BaseException:
+                skript.admission.release()
+                raise
+            try:
+                with tracer.span("driver_attach", idx):
+                    browser = await CdpBrowser(browser_data["ws"]["puppeteer"]).connect()
+                try:
+                    result = await self.mint(idx, browser, password, nugger)
+                finally:
+                    await browser.close()
+                profile_span.outcome = "pending" if isinstance(result, Future) else "ok"
+                return result
+            finally:
+                try:
+                    await asyncio.to_thread(skript.adspower.stop_browser, profile_id)
+                except skript.AdsPowerError as e:
+                    nugger.warning(f"Failed to stop the browser: {e}")
+                skript.admission.release()
+
+    async def mint(self, account, browser, password, nugger):
+        skript = self.skript
+        tracer = skript.tracer
+        store = skript.store
+
+        # Keep the first tab and close the others.
+        pages = await browser.pages()
+        for target in pages[1:]:
+            nugger.info("Cleaning extra tabs...")
+            await browser.close_target(target["targetId"])
+        page = await browser.attach(pages[0]["targetId"])
+        await page.send("Page.enable")
+
+        facts = store.get_facts(account)
+        steps = store.get_steps(account)
+
+        await page.navigate(skript.METAMASK_URL, skript.PAGE_LOAD_TIMEOUT)
+        wallet = await self.probe_metamask(page)
+
+        with tracer.span("metamask_unlock", account) as span:
+            if wallet['locked']:
+                await page.type(PASSWORD_INPUT, password, skript.INPUT_TIMEOUT)
+                await page.click(UNLOCK_BUTTON, skript.CLICK_TIMEOUT)
+                nugger.info("Logged into the wallet")
+                wallet = await self.probe_metamask(page)
+            else:
+                span.outcome = "skipped"
+
+        with tracer.span("wallet_connect", account) as span:
+            if facts.get('wallet_connected') or 'network_switch' in steps:
+                span.outcome = "skipped"
+            else:
+                # No fact yet: the dapp tells whether the profile is connected already.
+                await page.navigate(skript.TRENDING_FEED_URL, skript.PAGE_LOAD_TIMEOUT)
+                dapp = await page.wait_for(skript.DAPP_PROBE_JS, skript.PAGE_LOAD_TIMEOUT)
+                if dapp and dapp['connected']:
+                    span.outcome = "skipped"
+                    nugger.info("Already logged in. Skipping connection step.")
+                else:
+                    await page.navigate(skript.METAMASK_URL, skript.PAGE_LOAD_TIMEOUT)
+                    await self.probe_metamask(page)
+                    await page.click(NETWORK_DROPDOWN, skript.CLICK_TIMEOUT)
+                    await page.click(MAINNET_OPTION, skript.CLICK_TIMEOUT)
+                    await self.connect_wallet(browser, page, nugger)
+                store.set_fact(account, 'wallet_connected', 1)
+                await page.navigate(skript.METAMASK_URL, skript.PAGE_LOAD_TIMEOUT)
+                wallet = await self.probe_metamask(page)
+
+        with tracer.span("network_switch", account) as span:
+            if 'Zora' in (wallet['network'] or ''):
+                span.outcome = "skipped"
+            else:
+                await page.click(NETWORK_DROPDOWN, skript.CLICK_TIMEOUT)
+                timeout = skript.CLICK_TIMEOUT if facts.get('zora_added') else skript.NETWORK_LIST_TIMEOUT
+                if await page.click(ZORA_OPTION, timeout):
+                    nugger.info("Switched to the Zora network.")
+                else:
+                    span.outcome = "network_missing"
+                    await page.click(MAINNET_OPTION, skript.CLICK_TIMEOUT)
+                    with tracer.span("network_add", account):
+                        await self.add_zora_network(page, nugger)
+                store.set_fact(account, 'zora_added', 1)
+        store.record_step(account, 'network_switch')
+
+        with tracer.span("feed_harvest", account) as span:
+            if steps.get('collection'):
+                span.outcome = "resumed"
+                selected_link = steps['collection']
+            else:
+                selected_link = random.choice(await self.collections(page, nugger))
+                store.record_step(account, 'collection', selected_link)
+            nugger.info(f"Proceeding with this collection: {selected_link}")
+
+        with tracer.span("mint_click", account):
+            await page.navigate(selected_link, skript.PAGE_LOAD_TIMEOUT)
+            dapp = await page.wait_for(skript.DAPP_PROBE_JS, skript.PAGE_LOAD_TIMEOUT)
+            if dapp and not dapp['connected']:
+                nugger.warning("mint.fun is not connected anymore. Connecting again...")
+                await self.connect_wallet(browser, page, nugger)
+                await page.navigate(selected_link, skript.PAGE_LOAD_TIMEOUT)
+            await page.evaluate(skript.TX_HOOK_JS)
+            known_ids = {target["targetId"] for target in await browser.pages()}
+            address = await page.evaluate(skript.WALLET_ADDRESS_JS)
+            store.record_step(account, 'mint_click', await asyncio.to_thread(skript.mint_click_marker, address))
+            await page.click(MINT_BUTTON, skript.CLICK_TIMEOUT)
+
+        with tracer.span("confirm_transaction", account) as span:
+            confirmed = await self.confirm_transaction(browser, known_ids, nugger)
+            if not confirmed:
+                span.outcome = "failed"
+        nugger.info("Transaction sent. Waiting for minting confirmation...")
+
+        tx_hash = await page.wait_for(skript.TX_HASH_JS, skript.TX_HASH_TIMEOUT if skript.ONCHAIN_CONFIRMATION else 1)
+        if tx_hash:
+            store.record_step(account, 'tx_sent', tx_hash)
+
+        with tracer.span("result_wait", account) as span:
+            if tx_hash and skript.ONCHAIN_CONFIRMATION:
+                nugger.info(f"Transaction {tx_hash} sent. Confirming it on-chain...")
+                span.outcome = "pending"
+                return skript.receipt_watcher.watch(tx_hash)
+            if await page.wait_for(TOAST_JS, skript.MINT_RESULT_TIMEOUT, TOAST):
+                nugger.info("Minting was successful!")
+                return 1
+            if tx_hash:
+                nugger.info(f"Confirming transaction {tx_hash} on-chain instead...")
+                span.outcome = "pending"
+                return skript.receipt_watcher.watch(tx_hash)
+            nugger.error("Transaction took too long or failed. Recommend checking manually.")
+            span.outcome = "failed"
+        if not confirmed:
+            raise MintFailed(WALLET, "The transaction was not confirmed in MetaMask.")
+        raise MintFailed(AMBIGUOUS, "Neither a success message nor a transaction hash, the outcome is unknown.")
+
+    async def probe_metamask(self, page):
+        state = await page.wait_for(self.skript.METAMASK_PROBE_JS, self.skript.PAGE_LOAD_TIMEOUT)
+        return state or {'locked': True, 'network': None}
+
+    async def connect_wallet(self, browser, page, nugger):
+        skript = self.skript
+        await page.navigate(skript.TRENDING_FEED_URL, skript.PAGE_LOAD_TIMEOUT)
+        dapp = await page.wait_for(skript.DAPP_PROBE_JS, skript.PAGE_LOAD_TIMEOUT)
+        if dapp and dapp['connected']:
+            nugger.info("Already logged in. Skipping connection step.")
+            return
+        await page.click(NAV_BUTTON, skript.CLICK_TIMEOUT)
+        known_ids = {target["targetId"] for target in await browser.pages()}
+        await page.click(CONNECTKIT_METAMASK, skript.CLICK_TIMEOUT)
+
+        target = await browser.wait_for_new_page(known_ids, 'MetaMask Notification',
+                                                 skript.NOTIFICATION_TIMEOUT, skript.POLL_INTERVAL)
+        if not target:
+            nugger.warning("Metamask pop-up not found. System might be overloaded.")
+            return
+        popup = await browser.attach(target["targetId"])
+        for locator in CONNECT_POPUP_BUTTONS:
+            # Depending on the MetaMask version only some of the buttons exist.
+            await popup.click(locator, skript.NETWORK_LIST_TIMEOUT)
+        nugger.info("Connected to the 'Element' page...")
+
+    async def add_zora_network(self, page, nugger):
+        skript = self.skript
+        nugger.info("Zora network isn't added. Setting it up now.")
+        await page.navigate(f"chrome-extension://{skript.IDENTIFICATOR}/home.html#settings/networks/add-network",
+                            skript.PAGE_LOAD_TIMEOUT)
+        actions = [
+            ['fill', f'{NETWORK_FORM}/div[1]/label/input', "Zora"],
+            ['fill', f'{NETWORK_FORM}/div[2]/label/input', "https://rpc.zora.energy/"],
+            ['fill', f'{NETWORK_FORM}/div[3]/label/input', "7777777"],
+            ['fill', f'{NETWORK_FORM}/div[4]/label/input', "ETH"],
+            ['fill', f'{NETWORK_FORM}/div[5]/label/input', "https://explorer.zora.energy/"],
+        ]
+        results = await page.batch(skript.BATCH_JS, actions, skript.INPUT_TIMEOUT)
+        if not all(results):
+            nugger.warning(f"Some network fields could not be filled: {results}")
+        await page.click(NETWORK_SAVE_BUTTON, skript.CLICK_TIMEOUT)
+
+    async def collections(self, page, nugger):
+        """
+        Returns the free collections from the shared cache, harvesting them when it is stale.
+        """
+        skript = self.skript
+        cache = skript.collection_cache
+        async with self.harvest_lock:
+            if cache.is_fresh():
+                return list(cache.links)
+            nugger.info("Accessing free Zora NFTs page...")
+            await page.navigate(skript.FREE_FEED_URL, skript.PAGE_LOAD_TIMEOUT)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+            links = await page.wait_for(cache.HARVEST_JS, skript.PAGE_LOAD_TIMEOUT) or []
+            nugger.info(f"Identified {len(links)} NFTs available for minting.")
+            cache.update(links)
+            return list(links)
+
+    async def confirm_transaction(self, browser, known_ids, nugger):
+        skript = self.skript
+        target = await browser.wait_for_new_page(known_ids, 'MetaMask Notification',
+                                                 skript.NOTIFICATION_TIMEOUT, skript.POLL_INTERVAL)
+        if not target:
+            nugger.warning(f"MetaMask Notification window not found after {skript.NOTIFICATION_TIMEOUT} seconds.")
+            return False
+        popup = await browser.attach(target["targetId"])
+
+        nugger.info("Setting gas values in MetaMask.")
+        await popup.click(EDIT_GAS_BUTTON, skript.CLICK_TIMEOUT)
+        await popup.click(ADVANCED_GAS_BUTTON, skript.CLICK_TIMEOUT)
+        # The fee oracle is shared with the worker threads and may block on the RPC.
+        fees = await asyncio.to_thread(skript.suggest_gas, nugger)
+        results = await popup.batch(skript.BATCH_JS, [['fill', locator, fee] for locator, fee in zip(GAS_INPUTS, fees)]
+                                    + [['click', GAS_SAVE_BUTTON]], skript.INPUT_TIMEOUT)
+        if all(results):
+            nugger.info("Gas values set successfully.")
+        else:
+            nugger.warning(f"Setting gas values only partly worked: {results}")
+
+        if not await popup.evaluate(CONFIRM_JS, False):
+            nugger.warning("Unable to find the 'Confirm' button in MetaMask.")
+            return False
+        for i in range(5):
+            if not await browser.target_exists(target["targetId"]):
+                nugger.info("Transaction approved successfully!")
+                return True
+            nugger.info(f"Attempting to click the confirm button ({i + 1}/5)...")
+            await popup.evaluate(CONFIRM_JS, True)
+            deadline = time.monotonic() + 3
+            while time.monotonic() < deadline and await browser.target_exists(target["targetId"]):
+                await asyncio.sleep(skript.POLL_INTERVAL)
+        return True
@@ -0,0 +1,141 @@
+"""
+Non-interactive command line of the minter.
+
+    python cli.py run --range 1-200 --workers 4 [--engine cdp]
+    python cli.py status [--range 1-200]
+    python cli.py export
+
+Only `run` and `export` import Skript.py (and with it selenium and pandas). `status` reads the
+state store directly, or the columnar cache of Data.xlsx before the first run, so it answers
+instantly and never starts anything.
+"""
+# Standard library imports
+import argparse
+import datetime
+import json
+import os
+import sys
+
+# Local imports
+from leases import LeaseManager
+from sheet_cache import SheetCache
+from state_store import STATE_PATH, StateStore, summarize_progress
+
+DATA_PATH = "Data.xlsx"
+CONFIG_PATH = "config_user.json"
+
+
+def parse_range(value):
+    """
+    Parses an account range like "1-200" (inclusive) or a single account like "5".
+
+    Returns:
+    - tuple: (start_idx, end_idx), one-based.
+    """
+    start, _, end = value.partition("-")
+    try:
+        start_idx, end_idx = int(start), int(end or start)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid range {value!r}, expected e.g. 1-200")
+    if start_idx < 1 or start_idx > end_idx:
+        raise argparse.ArgumentTypeError(f"invalid range {value!r}, expected 1 <= start <= end")
+    return start_idx, end_idx
+
+
+def read_data_rows(file_path=DATA_PATH):
+    """
+    Reads (account, mint_total, time_stamp) rows from the columnar cache of the spreadsheet,
+    for `status` before the state store exists. Only the two progress columns are loaded.
+    """
+    sheet = SheetCache(file_path)
+    mint_totals = sheet.column('Mint_total').tolist()
+    time_stamps = sheet.column('Time_Stamp').tolist()
+    # Empty cells are NaN in a numeric column.
+    return [(account, int(mint_total) if mint_total == mint_total else 0, time_stamp)
+            for account, (mint_total, time_stamp) in enumerate(zip(mint_totals, time_stamps), start=1)]
+
+
+def read_config():
+    if not os.path.isfile(CONFIG_PATH):
+        return {}
+    with open(CONFIG_PATH) as f:
+        return json.load(f)
+
+
+def status(account_range=None):
+    config = read_config()
+    state_path = config.get('STATE_PATH', STATE_PATH)
+    leases = {}
+    if os.path.isfile(state_path):
+        store = StateStore(state_path, shared=bool(config.get('COORDINATION')))
+        rows = store.snapshot()
+        pending = len(store.pending_transactions())
+        store.close()
+        if config.get('COORDINATION'):
+            leases = LeaseManager(state_path).active()
+        source = state_path
+    else:
+        rows = read_data_rows()
+        pending = 0
+        source = DATA_PATH
+    if account_range:
+        start_idx, end_idx = account_range
+        rows = [row for row in rows if start_idx <= row[0] <= end_idx]
+
+    summary = summarize_progress(rows, datetime.datetime.now())
+    print(f"Accounts ({source}): {len(rows)}")
+    print(f"  completed:      {summary['completed']}")
+    print(f"  eligible now:   {summary['eligible_now']}")
+    print(f"  waiting:        {summary['waiting']}")
+    if summary['next_due']:
+        print(f"  next due at:    {summary['next_due']:%Y-%m-%d %H:%M:%S}")
+    if pending:
+        print(f"  unconfirmed tx: {pending}")
+    for host, count in sorted(leases.items()):
+        print(f"  leased by {host}: {count}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Zora mints on mint.fun through AdsPower profiles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Mint for a range of accounts until all of them are done")
+    run.add_argument("--range", dest="account_range", type=parse_range, required=True,
+                     help="Accounts to process, one-based and inclusive, e.g. 1-200")
+    run.add_argument("--workers", type=int, default=1,
+                     help="Number of AdsPower profiles processed at the same time (default: 1)")
+    run.add_argument("--engine", choices=("selenium", "cdp"), default="selenium",
+                     help="Browser automation engine (default: selenium)")
+
+    status = commands.add_parser("status", help="Print the progress of the accounts and exit")
+    status.add_argument("--range", dest="account_range", type=parse_range,
+                        help="Only count these accounts, e.g. 1-200")
+
+    commands.add_parser("export", help="Regenerate Data.xlsx from the state store")
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "status":
+        status(args.account_range)
+        return
+
+    # Everything else needs the full browser stack.
+    import Skript
+
+    if args.command == "export":
+        Skript.export()
+    else:
+        start_idx, end_idx = args.account_range
+        if end_idx > len(Skript.df):
+            sys.exit(f"Data.xlsx only has {len(Skript.df)} accounts.")
+        Skript.run(start_idx, end_idx, args.workers, args.engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Standard library imports
+import sqlite3
+import threading
+import time
+
+# Third-party imports
+import requests
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+# Local imports
+from adspower import AdsPowerError
+from zora_rpc import RpcError
+
+# AdsPower, the browser, the RPC or the state store are down or unresponsive.
+INFRA = "infrastructure"
+# A locator didn't match or a page didn't render in time.
+UI = "ui"
+# The MetaMask pop-up didn't show up, or the transaction was rejected or reverted.
+WALLET = "wallet"
+# The transaction may or may not have been sent; retrying soon risks a second mint.
+AMBIGUOUS = "ambiguous"
+
+# Retry policy per failure class: (first delay, backoff factor, maximum delay) in seconds.
+RETRY_POLICIES = {
+    INFRA: (30, 2, 600),
+    UI: (60, 2, 900),
+    WALLET: (120, 2, 1800),
+    AMBIGUOUS: (900, 2, 3600),
+}
+
+
+class MintFailed(Exception):
+    """
+    Raised by the mint flow when an attempt failed without an exception of its own.
+    """
+
+    def __init__(self, failure_class, message):
+        super().__init__(message)
+        self.failure_class = failure_class
+
+
+def classify(exc):
+    """
+    Sorts an exception of the mint flow into INFRA, UI, WALLET or AMBIGUOUS.
+
+    Exceptions can carry their class in a `failure_class` attribute (see `MintFailed`); unknown
+    exceptions count as UI failures.
+    """
+    failure_class = getattr(exc, "failure_class", None)
+    if failure_class:
+        return failure_class
+    if isinstance(exc, (AdsPowerError, RpcError, requests.RequestException, ConnectionError, sqlite3.Error)):
+        return INFRA
+    if isinstance(exc, NoSuchWindowException):
+        # The MetaMask pop-up closed before it could be used.
+        return WALLET
+    if isinstance(exc, (TimeoutException, NoSuchElementException, StaleElementReferenceException,
+                        ElementNotInteractableException, ElementClickInterceptedException, JavascriptException)):
+        return UI
+    if isinstance(exc, (WebDriverException, OSError)):
+        # Session lost, chromedriver gone or the browser refused the connection.
+        return INFRA
+    return UI
+
+
+class RetryPolicy:
+    """
+    Exponential backoff per account, with separate delays for every failure class.
+
+    The n-th consecutive failure of an account waits `first * factor ** (n - 1)` seconds, capped
+    at the class maximum. A success resets the count. `scale` multiplies every delay (the
+    benchmark uses it to run in seconds instead of minutes).
+    """
+
+    def __init__(self, policies=RETRY_POLICIES, scale=1.0):
+        self.policies = dict(policies)
+        self.scale = scale
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    def record_failure(self, idx, failure_class):
+        """
+        Counts a failure of an account and returns how long to wait before its next attempt.
+
+        Args:
+        - idx (int): One-based index of the account.
+        - failure_class (str): One of INFRA, UI, WALLET and AMBIGUOUS.
+
+        Returns:
+        - float: Delay in seconds.
+        """
+        first, factor, maximum = self.policies.get(failure_class, self.policies[UI])
+        with self.lock:
+            attempts = self.failures.get(idx, 0) + 1
+            self.failures[idx] = attempts
+        return min(first * factor ** (attempts - 1), maximum) * self.scale
+
+    def record_success(self, idx):
+        with self.lock:
+            self.failures.pop(idx, None)
+
+
+class CircuitBreaker:
+    """
+    Stops sending work to a dependency that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens for `reset_timeout` seconds,
+    then lets traffic through again; every further failure before a success re-opens it. Any
+    success closes it.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failure_threshold and self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def retry_in(self):
+        """
+        Returns the seconds until the circuit lets traffic through again, 0 if it is closed.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return 0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
@@ -0,0 +1,131 @@
+# Standard library imports
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+LEASE_TTL = 120
+
+
+def default_host_id():
+    # Several processes on one machine coordinate like separate hosts.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseManager:
+    """
+    Time-limited claims on accounts, so several hosts can work one account table without ever
+    processing the same account at the same time.
+
+    The leases live in a `leases` table of the shared state database. A host claims an account
+    before its browser is started and releases it when the attempt (including a pending on-chain
+    confirmation) is over. A heartbeat thread extends all leases of the host every `ttl` / 3
+    seconds; leases of a host that died simply expire and the account is picked up by whichever
+    host is idle next. `on_lost` is called with the accounts whose lease expired and was taken
+    over by another host anyway, e.g. after the machine was suspended.
+    """
+
+    def __init__(self, path, host_id=None, ttl=LEASE_TTL, on_lost=None):
+        self.path = path
+        self.host_id = host_id or default_host_id()
+        self.ttl = ttl
+        self.on_lost = on_lost
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        # A shared file may sit on a network drive, where WAL doesn't work and writers have to wait.
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                account INTEGER PRIMARY KEY,
+                host TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def claim(self, account):
+        """
+        Takes the lease of an account unless another host holds a lease that hasn't expired.
+
+        Args:
+        - account (int): One-based index of the account.
+
+        Returns:
+        - bool: True if this host holds the lease now.
+        """
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute("""
+                INSERT INTO leases (account, host, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(account) DO UPDATE SET host = excluded.host, expires_at = excluded.expires_at
+                WHERE leases.host = excluded.host OR leases.expires_at < ?
+            """, (int(account), self.host_id, now + self.ttl, now))
+            if cursor.rowcount != 1:
+                return False
+            self.held.add(int(account))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+                self.thread.start()
+        return True
+
+    def holder(self, account):
+        """
+        Returns the host holding an unexpired lease of an account and its expiry (Unix time), or None.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT host, expires_at FROM leases WHERE account = ? AND expires_at >= ?",
+                (int(account), time.time())).fetchone()
+
+    def release(self, account):
+        with self.lock:
+            self.held.discard(int(account))
+            self.connection.execute(
+                "DELETE FROM leases WHERE account = ? AND host = ?", (int(account), self.host_id))
+
+    def release_all(self):
+        self.stopped.set()
+        with self.lock:
+            self.held.clear()
+            self.connection.execute("DELETE FROM leases WHERE host = ?", (self.host_id,))
+
+    def renew(self):
+        """
+        Extends every lease of this host.
+
+        Returns:
+        - set: Accounts whose lease was lost meanwhile (it expired and another host took it).
+        """
+        with self.lock:
+            if not self.held:
+                return set()
+            self.connection.execute(
+                "UPDATE leases SET expires_at = ? WHERE host = ?", (time.time() + self.ttl, self.host_id))
+            owned = {account for account, in self.connection.execute(
+                "SELECT account FROM leases WHERE host = ?", (self.host_id,))}
+            lost = self.held - owned
+            self.held &= owned
+            return lost
+
+    def active(self):
+        """
+        Returns the number of unexpired leases per host.
+
+        Returns:
+        - dict: Host ID to lease count.
+        """
+        with self.lock:
+            return dict(self.connection.execute(
+                "SELECT host, COUNT(*) FROM leases WHERE expires_at >= ? GROUP BY host", (time.time(),)))
+
+    def _heartbeat(self):
+        while not self.stopped.wait(self.ttl / 3):
+            try:
+                lost = self.renew()
+            except sqlite3.Error:
+                # The shared file is busy or briefly unreachable, the next beat tries again.
+                continue
+            if lost and self.on_lost:
+                self.on_lost(lost)
@@ -0,0 +1,202 @@
+# Standard library imports
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from a quick confirmation to a profile that ran into every timeout.
+DEFAULT_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by label values, e.g. failures by reason.
+    """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values = {} if self.labels else {(): 0}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """
+    Value that goes up and down. Either set by the code or, with `set_function`, read at scrape
+    time, which keeps its cost out of the workers completely.
+    """
+
+    def __init__(self, name, help_text, function=None):
+        self.name = name
+        self.help_text = help_text
+        self.function = function
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        self.function = function
+
+    def get(self):
+        if self.function is not None:
+            return self.function()
+        with self.lock:
+            return self.value
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.get())}"]
+
+
+class Histogram:
+    """
+    Distribution of durations in cumulative buckets, as Prometheus expects them.
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def render(self):
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {round(total, 6)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class MintMetrics:
+    """
+    The metrics of a mint run. Workers only increment counters or record an observation under
+    a short lock; everything that needs a scan (eligible accounts, live browsers) is computed
+    when the endpoint is scraped.
+    """
+
+    def __init__(self):
+        self.attempted = Counter("mint_attempts_total", "Mint attempts started (one per browser session).")
+        self.succeeded = Counter("mint_successes_total", "Mints recorded as successful.")
+        self.failed = Counter("mint_failures_total", "Mint attempts that failed, by reason.", labels=("reason",))
+        self.eligible_now = Gauge("mint_accounts_eligible", "Accounts due for a mint and waiting to be dispatched.")
+        self.in_flight = Gauge("mint_accounts_in_flight", "Accounts being processed or confirmed on-chain.")
+        self.queue_depth = Gauge("mint_queue_depth", "Due accounts handed to the workers but not started yet.")
+        self.live_browsers = Gauge("mint_live_browsers", "AdsPower browsers currently running.")
+        self.profile_duration = Histogram("mint_process_profile_seconds", "Duration of process_profile.")
+        self.confirm_latency = Histogram("mint_confirm_transaction_seconds",
+                                         "Latency of confirming the transaction in MetaMask.",
+                                         buckets=(0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60))
+
+    def observe_span(self, step, duration, outcome):
+        """
+        Tracer listener feeding the latency histograms from the spans that are recorded anyway.
+        """
+        if step == "process_profile":
+            self.profile_duration.observe(duration)
+        elif step == "confirm_transaction":
+            self.confirm_latency.observe(duration)
+
+    def render(self):
+        lines = []
+        for metric in (self.attempted, self.succeeded, self.failed, self.eligible_now, self.in_flight,
+                       self.queue_depth, self.live_browsers, self.profile_duration, self.confirm_latency):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves the metrics in the Prometheus text format on http://host:port/metrics.
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,364 @@
+# Standard library imports
+import asyncio
+import os
+import socket
+import threading
+import time
+
+# Third-party imports
+import psutil
+
+# Local imports
+from adspower import RateLimiter
+
+REAP_INTERVAL = 60
+# Seconds a chromedriver gets to exit on its own after `quit` before it is killed.
+QUIT_GRACE = 5
+# Younger chromedrivers may still be on their way to `track`, they are never reaped.
+ORPHAN_MIN_AGE = 60
+# Defaults of the admission control in front of browser launches.
+MAX_CPU_PERCENT = 85
+MIN_FREE_MEMORY_MB = 1024
+ADMISSION_CHECK_INTERVAL = 2
+# Seconds between checks for a free browser slot in `acquire_async`.
+SLOT_POLL_INTERVAL = 0.25
+
+
+class ResourceGovernor:
+    """
+    Keeps the footprint of a long run flat by owning the teardown of every WebDriver.
+
+    Every driver attached to an AdsPower browser is registered with `track` and torn down with
+    `release` (`driver.quit()`, then its chromedriver process is killed if it is still alive).
+    Started profiles are tracked by the AdsPower client itself. A background thread periodically
+    reaps chromedriver processes nobody owns anymore and logs the live browser count and memory;
+    `shutdown` releases whatever is left on any exit path. The chromedriver processes are recorded
+    in `store` (see `state_store.StateStore.add_process`), so a later run can reap the ones a
+    crashed run left behind; chromedrivers of other tools are never touched.
+    """
+
+    def __init__(self, adspower, logger, interval=REAP_INTERVAL, store=None):
+        self.adspower = adspower
+        self.logger = logger
+        self.interval = interval
+        self.store = store
+        self.host = socket.gethostname()
+        self.drivers = {}
+        self.webdriver_names = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def track(self, account, driver, webdriver_path=None):
+        """
+        Registers a driver so it is torn down even if its owner never gets to do it.
+
+        Args:
+        - account (int): One-based index of the account the driver belongs to.
+        - driver (webdriver.Chrome): The driver.
+        - webdriver_path (str): Path of the chromedriver binary, used to recognize orphans of it.
+
+        Returns:
+        - webdriver.Chrome: The driver.
+        """
+        with self.lock:
+            self.drivers[id(driver)] = (account, driver)
+            if webdriver_path:
+                self.webdriver_names.add(os.path.basename(webdriver_path).lower())
+        process = _service_process(driver)
+        if process is not None and self.store is not None:
+            try:
+                self.store.add_process(self.host, process.pid, process.create_time())
+            except psutil.NoSuchProcess:
+                pass
+        return driver
+
+    def release(self, driver):
+        """
+        Quits a driver and makes sure its chromedriver process is gone. Safe to call twice.
+        """
+        with self.lock:
+            if self.drivers.pop(id(driver), None) is None:
+                return
+        process = _service_process(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            # A browser that is already gone makes quit fail, the process is handled below.
+            self.logger.debug(f"driver.quit() failed: {type(e).__name__}: {e}")
+        if process is not None:
+            _terminate([process])
+            self._forget([process])
+
+    def release_account(self, account):
+        """
+        Releases every driver still registered for an account, e.g. after attaching failed halfway.
+        """
+        with self.lock:
+            drivers = [driver for owner, driver in self.drivers.values() if owner == account]
+        for driver in drivers:
+            self.release(driver)
+
+    def live_service_pids(self):
+        with self.lock:
+            drivers = [driver for _, driver in self.drivers.values()]
+        pids = set()
+        for driver in drivers:
+            process = _service_process(driver)
+            if process is not None:
+                pids.add(process.pid)
+        return pids
+
+    def is_chromedriver(self, process):
+        name = process.name().lower()
+        return "chromedriver" in name or name in self.webdriver_names
+
+    def reap(self, min_age=ORPHAN_MIN_AGE):
+        """
+        Kills chromedriver processes that no tracked driver owns. Only two kinds of processes are
+        considered: children of this process whose driver was lost, and processes recorded in the
+        store by this or an earlier run whose parent process has died.
+
+        Args:
+        - min_age (float): Processes younger than this many seconds are left alone.
+
+        Returns:
+        - int: Number of processes killed.
+        """
+        me = os.getpid()
+        live = self.live_service_pids()
+        candidates = {process.pid: process for process in psutil.Process(me).children()}
+        for pid, create_time in self.store.processes(self.host) if self.store is not None else ():
+            try:
+                process = psutil.Process(pid)
+                # Same PID, different start time: the recorded process is gone and the PID reused.
+                if abs(process.create_time() - create_time) > 1:
+                    raise psutil.NoSuchProcess(pid)
+            except psutil.NoSuchProcess:
+                self.store.remove_process(self.host, pid)
+                continue
+            except psutil.AccessDenied:
+                continue
+            candidates.setdefault(pid, process)
+
+        orphans = []
+        for process in candidates.values():
+            try:
+                if process.pid in live or not self.is_chromedriver(process):
+                    continue
+                if time.time() - process.create_time() < min_age:
+                    continue
+                ppid = process.ppid()
+                if ppid == me or ppid in (0, 1) or not psutil.pid_exists(ppid):
+                    orphans.append(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if orphans:
+            self.logger.warning(f"Reaping {len(orphans)} orphaned chromedriver processes.")
+            _terminate(orphans)
+            self._forget(orphans)
+        return len(orphans)
+
+    def _forget(self, processes):
+        if self.store is None:
+            return
+        for process in processes:
+            self.store.remove_process(self.host, process.pid)
+
+    def report(self):
+        """
+        Returns the current footprint of the run.
+
+        Returns:
+        - dict: `drivers` (tracked WebDrivers), `browsers` (running AdsPower profiles),
+          `chromedrivers` (processes on the host), `rss_mb` (this process and its children) and
+          `available_mb` (free memory of the host).
+        """
+        me = psutil.Process()
+        rss = me.memory_info().rss
+        for child in me.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        chromedrivers = 0
+        for process in psutil.process_iter():
+            try:
+                chromedrivers += self.is_chromedriver(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        with self.lock:
+            drivers = len(self.drivers)
+        with self.adspower.lock:
+            browsers = len(self.adspower.started)
+        return {
+            'drivers': drivers,
+            'browsers': browsers,
+            'chromedrivers': chromedrivers,
+            'rss_mb': round(rss / 2 ** 20, 1),
+            'available_mb': round(psutil.virtual_memory().available / 2 ** 20),
+        }
+
+    def start(self):
+        """
+        Starts the background thread that reaps orphans and logs the footprint every `interval` seconds.
+        """
+        if self.thread is None and self.interval > 0:
+            self.thread = threading.Thread(target=self._run, name="resource-governor", daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.reap()
+                report = self.report()
+                self.logger.info(f"Resources: {report['browsers']} browsers, {report['drivers']} drivers, "
+                                 f"{report['chromedrivers']} chromedriver processes, {report['rss_mb']} MB RSS, "
+                                 f"{report['available_mb']} MB available")
+            except Exception as e:
+                self.logger.warning(f"Resource check failed: {type(e).__name__}: {e}")
+
+    def shutdown(self):
+        """
+        Stops the background thread, quits every tracked driver, stops every started profile and
+        reaps what is left. Safe to call more than once.
+
+        Returns:
+        - list: Profile IDs that could not be stopped.
+        """
+        self.stopped.set()
+        with self.lock:
+            drivers = [driver for _, driver in self.drivers.values()]
+        for driver in drivers:
+            self.release(driver)
+        failed = self.adspower.stop_all()
+        self.reap(min_age=0)
+        return failed
+
+
+class AdmissionController:
+    """
+    Decides when the next browser may be launched, so a saturated host doesn't turn into
+    timeouts in the MetaMask/mint flow.
+
+    A launch needs a free slot (at most `max_browsers` running, 0 for no cap), has to respect
+    the launch rate and waits while the host CPU load is above `max_cpu_percent` or its free
+    memory below `min_free_memory_mb`. The load limits never hold back the first browser,
+    otherwise a host that is busy with something else would stall the run completely.
+    """
+
+    def __init__(self, logger, max_browsers=0, launch_rate=0, max_cpu_percent=MAX_CPU_PERCENT,
+                 min_free_memory_mb=MIN_FREE_MEMORY_MB, check_interval=ADMISSION_CHECK_INTERVAL):
+        self.logger = logger
+        self.slots = threading.BoundedSemaphore(max_browsers) if max_browsers > 0 else None
+        self.limiter = RateLimiter(launch_rate)
+        self.max_cpu_percent = max_cpu_percent
+        self.min_free_memory_mb = min_free_memory_mb
+        self.check_interval = check_interval
+        self.active = 0
+        self.lock = threading.Lock()
+        # The first cpu_percent call only starts the measurement.
+        psutil.cpu_percent(interval=None)
+
+    def overload(self):
+        """
+        Returns why the host can't take another browser right now, or None if it can.
+        """
+        cpu = psutil.cpu_percent(interval=None)
+        if self.max_cpu_percent and cpu > self.max_cpu_percent:
+            return f"CPU load {cpu:.0f}% > {self.max_cpu_percent}%"
+        free_mb = psutil.virtual_memory().available / 2 ** 20
+        if self.min_free_memory_mb and free_mb < self.min_free_memory_mb:
+            return f"free memory {free_mb:.0f} MB < {self.min_free_memory_mb} MB"
+        return None
+
+    def acquire(self):
+        """
+        Blocks until a browser may be launched and takes its slot. Every `acquire` must be
+        followed by a `release` once the browser is stopped again.
+        """
+        if self.slots:
+            self.slots.acquire()
+        try:
+            held_back = None
+            while True:
+                reason = self._admit()
+                if reason is None:
+                    break
+                if reason != held_back:
+                    self.logger.warning(f"Holding off the next browser launch: {reason}")
+                    held_back = reason
+                time.sleep(self.check_interval)
+        except BaseException:
+            if self.slots:
+                self.slots.release()
+            raise
+        self.limiter.acquire()
+
+    async def acquire_async(self):
+        """
+        Counterpart of `acquire` for the CDP engine. Waits on the event loop instead of blocking
+        a thread of the default executor, which the AdsPower calls that free the slots need.
+        """
+        if self.slots:
+            while not self.slots.acquire(blocking=False):
+                await asyncio.sleep(SLOT_POLL_INTERVAL)
+        try:
+            held_back = None
+            while True:
+                reason = self._admit()
+                if reason is None:
+                    break
+                if reason != held_back:
+                    self.logger.warning(f"Holding off the next browser launch: {reason}")
+                    held_back = reason
+                await asyncio.sleep(self.check_interval)
+        except BaseException:
+            if self.slots:
+                self.slots.release()
+            raise
+        try:
+            await asyncio.sleep(self.limiter.reserve())
+        except BaseException:
+            self.release()
+            raise
+
+    def _admit(self):
+        # Counts the launch unless the host is overloaded; returns the reason to wait, or None.
+        with self.lock:
+            reason = self.overload() if self.active else None
+            if reason is None:
+                self.active += 1
+            return reason
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+        if self.slots:
+            self.slots.release()
+
+
+def _service_process(driver):
+    # The chromedriver process Selenium started for the driver, if there is one.
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None or process.poll() is not None:
+        return None
+    try:
+        return psutil.Process(process.pid)
+    except psutil.NoSuchProcess:
+        return None
+
+
+def _terminate(processes):
+    for process in processes:
+        try:
+            process.terminate()
+        except psutil.NoSuchProcess:
+            continue
+    _, alive = psutil.wait_procs(processes, timeout=QUIT_GRACE)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            continue
@@ -0,0 +1,136 @@
+# Standard library imports
+import json
+import os
+import pickle
+import threading
+import zipfile
+
+# Third-party imports
+import numpy as np
+
+CACHE_SUFFIX = ".cache.npz"
+# Bumped whenever the layout of the cache file changes, old files are then rebuilt.
+CACHE_VERSION = 1
+META_KEY = "__meta__"
+
+
+def source_key(path):
+    """
+    Returns what identifies a version of the workbook: its modification time and size.
+    """
+    stat = os.stat(path)
+    return [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+
+
+def _to_array(series):
+    # Numbers stay native arrays. Everything else becomes plain Python objects (datetime instead
+    # of pd.Timestamp, None instead of NaN/NaT), so reading the cache never needs pandas.
+    if series.dtype.kind in "biuf":
+        return series.to_numpy()
+    array = np.empty(len(series), dtype=object)
+    for i, value in enumerate(series.tolist()):
+        if value is not None and value != value:
+            value = None
+        elif hasattr(value, "to_pydatetime"):
+            value = value.to_pydatetime()
+        array[i] = value
+    return array
+
+
+class SheetCache:
+    """
+    Columnar copy of a spreadsheet that loads in milliseconds instead of parsing the workbook.
+
+    Every column is stored as a NumPy array in one uncompressed .npz file next to the workbook,
+    together with the modification time and size of the workbook it was read from; the workbook
+    is only parsed again when one of them changed. Columns are read from the file on first
+    access, so e.g. `cli.py status` never loads the passwords.
+    """
+
+    def __init__(self, path, cache_path=None):
+        self.path = path
+        self.cache_path = cache_path or f"{path}{CACHE_SUFFIX}"
+        self.columns = None
+        self.rows = 0
+        self.archive = None
+        self.loaded = {}
+        self.lock = threading.Lock()
+
+    def open(self):
+        """
+        Opens the cache file, or rebuilds it from the workbook if it is missing or outdated.
+
+        Returns:
+        - SheetCache: The cache itself.
+        """
+        with self.lock:
+            if self.columns is not None:
+                return self
+            key = source_key(self.path)
+            try:
+                archive = np.load(self.cache_path, allow_pickle=True)
+            except (OSError, ValueError, EOFError, zipfile.BadZipFile, pickle.UnpicklingError):
+                archive = None
+            if archive is not None:
+                try:
+                    meta = json.loads(str(archive[META_KEY]))
+                except (KeyError, ValueError):
+                    meta = {}
+                if meta.get('key') == key:
+                    self.archive = archive
+                    self.columns = meta['columns']
+                    self.rows = meta['rows']
+                    return self
+                archive.close()
+            self._rebuild(key)
+        return self
+
+    def _rebuild(self, key):
+        # Only a changed workbook needs pandas and openpyxl.
+        import pandas as pd
+
+        df = pd.read_excel(self.path)
+        self.columns = [str(name) for name in df.columns]
+        self.rows = len(df)
+        self.loaded = {name: _to_array(df.iloc[:, i]) for i, name in enumerate(self.columns)}
+        arrays = {f"column{i}": self.loaded[name] for i, name in enumerate(self.columns)}
+        arrays[META_KEY] = np.array(json.dumps({'key': key, 'columns': self.columns, 'rows': self.rows}))
+        # Written next to the cache and moved over it, so a crash never leaves half a file behind.
+        tmp_path = f"{self.cache_path}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only directory only costs the next start another parse.
+            pass
+
+    def column(self, name):
+        """
+        Returns one column of the sheet, reading it from the cache file on first use.
+
+        Args:
+        - name (str): Column header as in the workbook.
+
+        Returns:
+        - numpy.ndarray: The values of the column, one per row.
+        """
+        self.open()
+        with self.lock:
+            if name not in self.loaded:
+                self.loaded[name] = self.archive[f"column{self.columns.index(name)}"]
+            return self.loaded[name]
+
+    def frame(self, exclude=()):
+        """
+        Builds a data frame of the sheet, with the columns in workbook order.
+
+        Args:
+        - exclude (tuple): Columns that are left out and never read, e.g. ('Password',).
+
+        Returns:
+        - pd.DataFrame: The sheet, with the default zero-based index.
+        """
+        import pandas as pd
+
+        self.open()
+        return pd.DataFrame({name: self.column(name) for name in self.columns if name not in exclude})
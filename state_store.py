@@ -0,0 +1,485 @@
+# Standard library imports
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+STATE_PATH = "state.db"
+COMPACT_EVERY = 100
+# An account is done after MAX_TRX mints and may mint again MINT_COOLDOWN_HOURS after the last one.
+MAX_TRX = 7
+MINT_COOLDOWN_HOURS = 24
+# Tables whose rows belong to an account (one-based row of the spreadsheet).
+ACCOUNT_TABLES = ("accounts", "mint_journal", "step_journal", "profile_facts")
+
+
+class StateError(Exception):
+    """
+    Raised when the stored progress can't be matched with the spreadsheet.
+    """
+
+
+class StateStore:
+    """
+    Crash-safe storage of the mint progress of every account.
+
+    Every successful mint is appended to the `mint_journal` table in its own small SQLite
+    transaction, so a crash or Ctrl-C can never leave half-written state behind. The journal is
+    periodically folded into the `accounts` table (compaction). Data.xlsx is only regenerated
+    from the store on request, it is no longer written after every mint.
+    """
+
+    def __init__(self, path=STATE_PATH, compact_every=COMPACT_EVERY, shared=False):
+        self.path = path
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        # A file shared by several hosts may sit on a network drive, where WAL doesn't work and
+        # writers of other hosts have to be waited for.
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                          timeout=30 if shared else 5)
+        self.connection.execute("PRAGMA journal_mode=DELETE" if shared else "PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS accounts (
+                account INTEGER PRIMARY KEY,
+                mint_total INTEGER NOT NULL,
+                time_stamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS mint_journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account INTEGER NOT NULL,
+                time_stamp TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS step_journal (
+                account INTEGER NOT NULL,
+                step TEXT NOT NULL,
+                value TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (account, step)
+            );
+            CREATE TABLE IF NOT EXISTS profile_facts (
+                account INTEGER NOT NULL,
+                fact TEXT NOT NULL,
+                value TEXT,
+                PRIMARY KEY (account, fact)
+            );
+            CREATE TABLE IF NOT EXISTS retired_accounts (
+                profile_id TEXT PRIMARY KEY,
+                mint_total INTEGER NOT NULL,
+                time_stamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS chromedrivers (
+                host TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                create_time REAL NOT NULL,
+                PRIMARY KEY (host, pid)
+            );
+        """)
+        # Stores of older versions knew accounts only by their row.
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(accounts)")]
+        if 'profile_id' not in columns:
+            self.connection.execute("ALTER TABLE accounts ADD COLUMN profile_id TEXT")
+        self.pending = self.connection.execute("SELECT COUNT(*) FROM mint_journal").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def seed(self, df):
+        """
+        Matches the stored progress with the rows of the spreadsheet and adds new accounts.
+
+        Accounts are identified by their `Profile ID`, the row number is only where the account
+        currently is. If rows were inserted, deleted or re-sorted in Data.xlsx, the progress, step
+        journal and facts of every profile move along to its new row. Profiles removed from the
+        sheet are retired and get their progress back if they are added again. Rows without a
+        Profile ID (the blank rows of the template) are not accounts and are skipped. Accounts that are
+        already known keep their stored progress, so editing or re-exporting Data.xlsx never
+        rolls back mints that were recorded.
+
+        Args:
+        - df (pd.DataFrame): The data frame containing profile data (one-based index).
+
+        Returns:
+        - int: Number of accounts added.
+
+        Raises:
+        - StateError: If a profile ID is in the sheet twice, or rows moved while another host
+          holds leases of the affected accounts.
+        """
+        rows = {}
+        for idx in df.index:
+            profile_id = df.at[idx, 'Profile ID']
+            if _is_missing(profile_id) or not str(profile_id).strip():
+                continue
+            profile_id = str(profile_id).strip()
+            if profile_id in rows:
+                raise StateError(f"Profile ID {profile_id} is in Data.xlsx twice (rows {rows[profile_id][0]} "
+                                 f"and {int(idx)}).")
+            time_stamp = df.at[idx, 'Time_Stamp']
+            time_stamp = None if _is_missing(time_stamp) else str(time_stamp)
+            rows[profile_id] = (int(idx), int(df.at[idx, 'Mint_total']), time_stamp)
+
+        with self.lock:
+            # Moved accounts take their whole progress along, fold the mint journal in first.
+            self._compact()
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Stores of older versions knew no profile IDs at all, they take the ones of the sheet
+                # as it is now.
+                if not self.connection.execute(
+                        "SELECT COUNT(*) FROM accounts WHERE profile_id IS NOT NULL").fetchone()[0]:
+                    self.connection.executemany(
+                        "UPDATE accounts SET profile_id = ? WHERE account = ?",
+                        [(profile_id, row[0]) for profile_id, row in rows.items()])
+                taken = {row[0] for row in rows.values()}
+                moved, retired = {}, []
+                for account, profile_id in self.connection.execute("SELECT account, profile_id FROM accounts"):
+                    if profile_id is None:
+                        # Left over from a blank row of an older version; only in the way once a
+                        # profile is put into that row.
+                        if account in taken:
+                            retired.append(account)
+                    elif profile_id not in rows:
+                        retired.append(account)
+                    elif rows[profile_id][0] != account:
+                        moved[account] = rows[profile_id][0]
+                if moved or retired:
+                    self._move_accounts(moved, retired)
+
+                added = 0
+                for profile_id, (account, mint_total, time_stamp) in rows.items():
+                    # A profile that comes back continues where it left off.
+                    stored = self.connection.execute(
+                        "SELECT mint_total, time_stamp FROM retired_accounts WHERE profile_id = ?",
+                        (profile_id,)).fetchone()
+                    if stored:
+                        mint_total, time_stamp = stored
+                    cursor = self.connection.execute(
+                        "INSERT OR IGNORE INTO accounts (account, mint_total, time_stamp, profile_id) "
+                        "VALUES (?, ?, ?, ?)", (account, mint_total, time_stamp, profile_id))
+                    if cursor.rowcount:
+                        added += 1
+                        if stored:
+                            self.connection.execute("DELETE FROM retired_accounts WHERE profile_id = ?", (profile_id,))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return added
+
+    def _move_accounts(self, moved, retired):
+        # Runs inside the transaction of `seed`: `moved` maps old rows to new ones, `retired`
+        # lists rows whose profile is no longer in the sheet.
+        changed = list(moved) + retired
+        has_leases = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leases'").fetchone()
+        if has_leases:
+            placeholders = ",".join("?" * len(changed))
+            held = self.connection.execute(
+                f"SELECT account FROM leases WHERE account IN ({placeholders}) AND expires_at >= ?",
+                (*changed, time.time())).fetchall()
+            if held:
+                raise StateError(f"Rows of Data.xlsx moved while accounts {sorted(a for a, in held)} are leased "
+                                 f"by another host. Stop the other hosts first.")
+        for account in retired:
+            self.connection.execute("""
+                INSERT OR REPLACE INTO retired_accounts (profile_id, mint_total, time_stamp)
+                SELECT profile_id, mint_total, time_stamp FROM accounts WHERE account = ? AND profile_id IS NOT NULL
+            """, (account,))
+            for table in ACCOUNT_TABLES:
+                self.connection.execute(f"DELETE FROM {table} WHERE account = ?", (account,))
+        # Through negative numbers, so two accounts can swap rows without a key conflict.
+        for table in ACCOUNT_TABLES:
+            self.connection.executemany(
+                f"UPDATE {table} SET account = ? WHERE account = ?", [(-new, old) for old, new in moved.items()])
+            self.connection.execute(f"UPDATE {table} SET account = -account WHERE account < 0")
+
+    def load_into(self, df):
+        """
+        Overwrites `Mint_total` and `Time_Stamp` of the data frame with the stored progress.
+
+        Args:
+        - df (pd.DataFrame): The data frame containing profile data (one-based index).
+
+        Returns:
+        None
+        """
+        for account, mint_total, time_stamp in self.snapshot():
+            if account in df.index:
+                df.at[account, 'Mint_total'] = mint_total
+                df.at[account, 'Time_Stamp'] = parse_timestamp(time_stamp)
+
+    def snapshot(self):
+        """
+        Returns the current progress of every account, journal entries included.
+
+        Returns:
+        - list: (account, mint_total, time_stamp) tuples ordered by account.
+        """
+        with self.lock:
+            return self.connection.execute("""
+                SELECT a.account,
+                       a.mint_total + COUNT(j.id),
+                       COALESCE(MAX(j.time_stamp), a.time_stamp)
+                FROM accounts a LEFT JOIN mint_journal j ON j.account = a.account
+                GROUP BY a.account
+                ORDER BY a.account
+            """).fetchall()
+
+    def account_progress(self, idx):
+        """
+        Returns the current progress of one account, e.g. to pick up mints another host recorded.
+
+        Args:
+        - idx (int): One-based index of the account.
+
+        Returns:
+        - tuple: (mint_total, time_stamp), or None if the account is unknown.
+        """
+        with self.lock:
+            return self.connection.execute("""
+                SELECT a.mint_total + COUNT(j.id), COALESCE(MAX(j.time_stamp), a.time_stamp)
+                FROM accounts a LEFT JOIN mint_journal j ON j.account = a.account
+                WHERE a.account = ?
+                GROUP BY a.account
+            """, (int(idx),)).fetchone()
+
+    def record_mint(self, idx, time_stamp):
+        """
+        Appends one successful mint to the journal as a single atomic write.
+
+        The step journal of the finished attempt is cleared in the same transaction, so a crash
+        can't leave an account both minted and "transaction pending".
+
+        Args:
+        - idx (int): One-based index of the account.
+        - time_stamp (str): Time of the mint in TIMESTAMP_FORMAT.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.connection.execute("BEGIN")
+            self.connection.execute(
+                "INSERT INTO mint_journal (account, time_stamp) VALUES (?, ?)", (int(idx), time_stamp))
+            self.connection.execute("DELETE FROM step_journal WHERE account = ?", (int(idx),))
+            self.connection.execute("COMMIT")
+            self.pending += 1
+            if self.pending >= self.compact_every:
+                self._compact()
+
+    def record_step(self, idx, step, value=None):
+        """
+        Marks a step of the current mint attempt of an account as completed.
+
+        Args:
+        - idx (int): One-based index of the account.
+        - step (str): Name of the step, e.g. "mint_click" or "tx_sent".
+        - value (str): Optional data of the step, e.g. the selected collection or the tx hash.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO step_journal (account, step, value, updated_at) "
+                "VALUES (?, ?, ?, datetime('now', 'localtime'))",
+                (int(idx), step, None if value is None else str(value)))
+
+    def get_steps(self, idx):
+        """
+        Returns the completed steps of the unfinished mint attempt of an account.
+
+        Args:
+        - idx (int): One-based index of the account.
+
+        Returns:
+        - dict: Step name to value; empty if the last attempt finished.
+        """
+        with self.lock:
+            return dict(self.connection.execute(
+                "SELECT step, value FROM step_journal WHERE account = ?", (int(idx),)).fetchall())
+
+    def clear_steps(self, idx, step=None):
+        """
+        Forgets the step journal of an account once its attempt has finished, or only one `step` of it.
+        """
+        with self.lock:
+            if step is None:
+                self.connection.execute("DELETE FROM step_journal WHERE account = ?", (int(idx),))
+            else:
+                self.connection.execute(
+                    "DELETE FROM step_journal WHERE account = ? AND step = ?", (int(idx), step))
+
+    def pending_transactions(self):
+        """
+        Returns the accounts whose last attempt sent a transaction that was never reconciled.
+
+        Returns:
+        - list: (account, tx_hash) tuples.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT account, value FROM step_journal WHERE step = 'tx_sent' AND value IS NOT NULL "
+                "ORDER BY account").fetchall()
+
+    def get_facts(self, idx):
+        """
+        Returns what is known about the browser profile of an account, e.g. {"zora_added": "1"}.
+
+        Args:
+        - idx (int): One-based index of the account.
+
+        Returns:
+        - dict: Fact name to value.
+        """
+        with self.lock:
+            return dict(self.connection.execute(
+                "SELECT fact, value FROM profile_facts WHERE account = ?", (int(idx),)).fetchall())
+
+    def set_fact(self, idx, fact, value):
+        """
+        Remembers (or with value None forgets) a fact about the browser profile of an account.
+
+        Args:
+        - idx (int): One-based index of the account.
+        - fact (str): Name of the fact.
+        - value (str): Value of the fact, None to delete it.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            if value is None:
+                self.connection.execute(
+                    "DELETE FROM profile_facts WHERE account = ? AND fact = ?", (int(idx), fact))
+            else:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO profile_facts (account, fact, value) VALUES (?, ?, ?)",
+                    (int(idx), fact, str(value)))
+
+    def add_process(self, host, pid, create_time):
+        """
+        Remembers a chromedriver process this run started, see `resources.ResourceGovernor.reap`.
+
+        Args:
+        - host (str): Name of the machine the process runs on.
+        - pid (int): Process ID.
+        - create_time (float): Start time of the process, tells a reused PID apart.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO chromedrivers (host, pid, create_time) VALUES (?, ?, ?)",
+                (host, int(pid), float(create_time)))
+
+    def remove_process(self, host, pid):
+        with self.lock:
+            self.connection.execute("DELETE FROM chromedrivers WHERE host = ? AND pid = ?", (host, int(pid)))
+
+    def processes(self, host):
+        """
+        Returns the chromedriver processes recorded on a machine, by this or an earlier run.
+
+        Returns:
+        - list: (pid, create_time) tuples.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT pid, create_time FROM chromedrivers WHERE host = ?", (host,)).fetchall()
+
+    def compact(self):
+        """
+        Folds the journal into the `accounts` table and empties it.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("""
+                INSERT INTO accounts (account, mint_total, time_stamp)
+                SELECT account, COUNT(*), MAX(time_stamp) FROM mint_journal WHERE true GROUP BY account
+                ON CONFLICT(account) DO UPDATE SET
+                    mint_total = accounts.mint_total + excluded.mint_total,
+                    time_stamp = MAX(COALESCE(accounts.time_stamp, ''), excluded.time_stamp)
+            """)
+            self.connection.execute("DELETE FROM mint_journal")
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.pending = 0
+
+    def export_excel(self, df, file_path):
+        """
+        Regenerates the spreadsheet from the stored progress.
+
+        The workbook is written to a temporary file first and then moved over the original,
+        so an interrupted export leaves the previous Data.xlsx intact.
+
+        Args:
+        - df (pd.DataFrame): The data frame containing profile data (one-based index).
+        - file_path (str): Path to the excel file.
+
+        Returns:
+        None
+        """
+        self.load_into(df)
+        tmp_path = f"{file_path}.tmp.xlsx"
+        df.to_excel(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+
+
+def summarize_progress(rows, now):
+    """
+    Counts finished, eligible and waiting accounts from stored progress, without pandas.
+
+    Same rules as `compute_due_times`/`summarize_eligibility` in Skript.py, used by the `status`
+    command so it doesn't have to load the spreadsheet or the browser stack.
+
+    Args:
+    - rows (list): (account, mint_total, time_stamp) tuples as returned by `StateStore.snapshot`.
+    - now (datetime.datetime): Current time.
+
+    Returns:
+    - dict: `completed`, `eligible_now` and `waiting` counts plus `next_due`, the earliest due time
+      of the waiting accounts (None if there are none).
+    """
+    summary = {'completed': 0, 'eligible_now': 0, 'waiting': 0, 'next_due': None}
+    cooldown = datetime.timedelta(hours=MINT_COOLDOWN_HOURS)
+    for _, mint_total, time_stamp in rows:
+        last_mint = time_stamp if isinstance(time_stamp, datetime.datetime) else parse_timestamp(time_stamp)
+        if mint_total >= MAX_TRX:
+            summary['completed'] += 1
+        elif last_mint is None or last_mint + cooldown <= now:
+            summary['eligible_now'] += 1
+        else:
+            summary['waiting'] += 1
+            if summary['next_due'] is None or last_mint + cooldown < summary['next_due']:
+                summary['next_due'] = last_mint + cooldown
+    return summary
+
+
+def parse_timestamp(time_stamp):
+    """
+    Converts a stored timestamp back to a datetime, keeping missing or malformed values as None.
+    """
+    try:
+        return datetime.datetime.strptime(time_stamp, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_missing(value):
+    # NaN/NaT never compare equal to themselves.
+    return value is None or value != value
@@ -0,0 +1,167 @@
+# Standard library imports
+import contextlib
+import json
+import math
+import sys
+import threading
+import time
+from collections import defaultdict
+
+TRACE_PATH = "trace.jsonl"
+# Outcomes counted as failures in the summary; others like "skipped" are informational.
+FAILED_OUTCOMES = ("error", "failed")
+
+
+class Span:
+    """
+    One timed step of a profile. `outcome` can be changed inside the `with` block,
+    e.g. to "failed" when a step returned False without raising.
+    """
+
+    def __init__(self, step, account):
+        self.step = step
+        self.account = account
+        self.outcome = "ok"
+        self.error = None
+
+
+class Tracer:
+    """
+    Records the duration of every step of `process_profile` as JSON lines in a trace file.
+
+    The account of the current thread is set once with `account` and picked up by every span
+    opened in that thread, so helper functions don't need to pass it around. Functions in
+    `listeners` are called with (step, duration, outcome) of every finished span.
+    """
+
+    def __init__(self, path=TRACE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.listeners = []
+        self.file = open(path, "a", encoding="utf-8", buffering=1) if path else None
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+    @contextlib.contextmanager
+    def account(self, account):
+        """
+        Attributes all spans of the current thread to `account` until the block exits.
+        """
+        previous = getattr(self.local, "account", None)
+        self.local.account = account
+        try:
+            yield
+        finally:
+            self.local.account = previous
+
+    @contextlib.contextmanager
+    def span(self, step, account=None):
+        """
+        Times a step. An exception marks the span as "error" with its type and is re-raised.
+
+        Args:
+        - step (str): Name of the step, e.g. "adspower_start".
+        - account (int): Account of the span; defaults to the one set for the current thread.
+          Coroutines share a thread, so the asyncio engine passes it explicitly.
+
+        Yields:
+        - Span: The span, its `outcome` may be overwritten by the caller.
+        """
+        span = Span(step, account if account is not None else getattr(self.local, "account", None))
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.outcome = "error"
+            span.error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for listener in self.listeners:
+                listener(span.step, duration, span.outcome)
+            self.write({
+                "account": span.account,
+                "step": span.step,
+                "start": round(started_at, 3),
+                "duration": round(duration, 4),
+                "outcome": span.outcome,
+                "error": span.error,
+            })
+
+    def write(self, record):
+        if not self.file:
+            return
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            if self.file:
+                self.file.write(line)
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted, non-empty list.
+    """
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(path=TRACE_PATH):
+    """
+    Aggregates a trace file into latency statistics per step.
+
+    Args:
+    - path (str): Path to the trace file.
+
+    Returns:
+    - list: One dict per step (count, failed, skipped, p50, p95, max, total seconds), slowest total first.
+    """
+    durations = defaultdict(list)
+    failures = defaultdict(int)
+    skipped = defaultdict(int)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a half-written last line behind.
+                continue
+            durations[record["step"]].append(record["duration"])
+            if record["outcome"] in FAILED_OUTCOMES:
+                failures[record["step"]] += 1
+            elif record["outcome"] == "skipped":
+                skipped[record["step"]] += 1
+
+    summary = []
+    for step, values in durations.items():
+        values.sort()
+        summary.append({
+            "step": step,
+            "count": len(values),
+            "failed": failures[step],
+            "skipped": skipped[step],
+            "p50": percentile(values, 0.5),
+            "p95": percentile(values, 0.95),
+            "max": values[-1],
+            "total": sum(values),
+        })
+    summary.sort(key=lambda row: row["total"], reverse=True)
+    return summary
+
+
+def print_summary(path=TRACE_PATH):
+    summary = summarize(path)
+    print(f"{'step':<22}{'count':>7}{'failed':>8}{'skipped':>9}"
+          f"{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'total s':>10}")
+    for row in summary:
+        print(f"{row['step']:<22}{row['count']:>7}{row['failed']:>8}{row['skipped']:>9}"
+              f"{row['p50']:>9.2f}{row['p95']:>9.2f}{row['max']:>9.2f}{row['total']:>10.1f}")
+
+
+if __name__ == "__main__":
+    print_summary(sys.argv[1] if len(sys.argv) > 1 else TRACE_PATH)
@@ -0,0 +1,359 @@
+# Standard library imports
+import heapq
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Third-party imports
+import requests
+from requests.adapters import HTTPAdapter
+
+ZORA_RPC_URL = "https://rpc.zora.energy/"
+ZORA_CHAIN_ID = 7777777
+REQUEST_TIMEOUT = (3, 15)
+GWEI = 10 ** 9
+
+
+class RpcError(Exception):
+    """
+    Raised when the RPC endpoint is unreachable or answers with a JSON-RPC error.
+    """
+
+
+class ZoraRpcClient:
+    """
+    Minimal JSON-RPC client of the Zora chain over one pooled keep-alive session.
+    """
+
+    def __init__(self, url=ZORA_RPC_URL, timeout=REQUEST_TIMEOUT, breaker=None):
+        self.url = url
+        self.timeout = timeout
+        # Told about every request that failed or succeeded, see `failures.CircuitBreaker`.
+        self.breaker = breaker
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=8))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=8))
+        self.ids = itertools.count(1)
+
+    def _post(self, payload):
+        try:
+            resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+            resp.raise_for_status()
+            result = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            if self.breaker:
+                self.breaker.record_failure()
+            raise RpcError(f"RPC request to {self.url} failed: {e}") from e
+        if self.breaker:
+            self.breaker.record_success()
+        return result
+
+    def call(self, method, params=()):
+        """
+        Sends one JSON-RPC request.
+
+        Args:
+        - method (str): RPC method, e.g. "eth_getTransactionReceipt".
+        - params (list): Positional parameters of the method.
+
+        Returns:
+        - The `result` of the response.
+        """
+        resp = self._post({"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": list(params)})
+        if resp.get("error"):
+            raise RpcError(f"{method} failed: {resp['error']}")
+        return resp.get("result")
+
+    def call_batch(self, calls):
+        """
+        Sends several JSON-RPC requests in one HTTP round trip.
+
+        Args:
+        - calls (list): (method, params) tuples.
+
+        Returns:
+        - list: Result per call in the same order; None for calls that returned an error.
+        """
+        if not calls:
+            return []
+        ids = [next(self.ids) for _ in calls]
+        payload = [{"jsonrpc": "2.0", "id": request_id, "method": method, "params": list(params)}
+                   for request_id, (method, params) in zip(ids, calls)]
+        resp = self._post(payload)
+        if not isinstance(resp, list):
+            raise RpcError(f"Batch request failed: {resp.get('error') if isinstance(resp, dict) else resp}")
+        results = {item.get("id"): item.get("result") for item in resp}
+        return [results.get(request_id) for request_id in ids]
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.call("eth_getTransactionReceipt", [tx_hash])
+
+    def get_transaction(self, tx_hash):
+        return self.call("eth_getTransactionByHash", [tx_hash])
+
+    def get_transaction_count(self, address, block="latest"):
+        return int(self.call("eth_getTransactionCount", [address, block]), 16)
+
+    def fee_history(self, block_count, reward_percentiles):
+        return self.call("eth_feeHistory", [hex(block_count), "latest", list(reward_percentiles)])
+
+    def gas_price(self):
+        return int(self.call("eth_gasPrice"), 16)
+
+
+class FeeOracle:
+    """
+    EIP-1559 fee suggestion from the Zora RPC, cached for `ttl` seconds and shared by all workers.
+
+    The max base fee is the base fee of the next block times `base_fee_multiplier`, so the
+    transaction survives a few blocks of rising fees; the priority fee is the median of the
+    `reward_percentile` tips of the last `block_count` blocks. Without `eth_feeHistory` the
+    suggestion is derived from `eth_gasPrice`. If the RPC is unreachable the last suggestion is
+    reused, however old it is.
+    """
+
+    def __init__(self, client, ttl=30.0, block_count=10, reward_percentile=50, base_fee_multiplier=2.0,
+                 min_priority_fee_wei=1):
+        self.client = client
+        self.ttl = ttl
+        self.block_count = block_count
+        self.reward_percentile = reward_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee_wei = min_priority_fee_wei
+        self.value = None
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+    def _fetch(self):
+        try:
+            history = self.client.fee_history(self.block_count, [self.reward_percentile])
+            next_base_fee = int(history["baseFeePerGas"][-1], 16)
+            tips = sorted(int(reward[0], 16) for reward in history.get("reward") or [] if reward)
+            priority_fee = tips[len(tips) // 2] if tips else self.min_priority_fee_wei
+        except (RpcError, KeyError, IndexError, TypeError, ValueError):
+            # Not every endpoint serves fee history, the legacy gas price includes the tip.
+            gas_price = self.client.gas_price()
+            priority_fee = max(gas_price // 10, self.min_priority_fee_wei)
+            next_base_fee = gas_price - priority_fee
+        priority_fee = max(priority_fee, self.min_priority_fee_wei)
+        return int(next_base_fee * self.base_fee_multiplier) + 1, priority_fee
+
+    def fees(self):
+        """
+        Returns the current fee suggestion, fetching it only when the cached one has expired.
+
+        Returns:
+        - tuple: (max_base_fee, priority_fee) in gwei, or None if no suggestion could be made yet.
+        """
+        with self.lock:
+            if self.fetched_at is None or time.monotonic() - self.fetched_at >= self.ttl:
+                try:
+                    max_base_fee, priority_fee = self._fetch()
+                    self.value = (max_base_fee / GWEI, priority_fee / GWEI)
+                except (RpcError, TypeError, ValueError):
+                    # Keep the last value, retry on the next call.
+                    pass
+                else:
+                    self.fetched_at = time.monotonic()
+            return self.value
+
+
+class ReceiptWatcher:
+    """
+    Confirms transactions on-chain in the background by polling their receipts.
+
+    `watch` returns immediately with a Future, so the worker can release its browser while the
+    transaction is mined. One thread polls all pending transactions, batching every receipt that
+    is due into a single JSON-RPC request, with a growing interval per transaction.
+
+    The Future resolves to True (status 0x1), False (reverted) or None (no receipt before the
+    deadline, the outcome is unknown).
+    """
+
+    def __init__(self, client, timeout=300, initial_interval=1.0, max_interval=15.0, backoff=1.5):
+        self.client = client
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.heap = []
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def watch(self, tx_hash):
+        """
+        Starts polling the receipt of a transaction.
+
+        Args:
+        - tx_hash (str): Hash of the sent transaction.
+
+        Returns:
+        - Future: Resolves to True, False or None, see the class docstring.
+        """
+        future = Future()
+        now = time.monotonic()
+        with self.condition:
+            heapq.heappush(self.heap, (now, tx_hash, self.initial_interval, now + self.timeout, future))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="receipt-watcher", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+        return future
+
+    def pending(self):
+        with self.condition:
+            return len(self.heap)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.heap or self.heap[0][0] > time.monotonic():
+                    self.condition.wait(timeout=self.heap[0][0] - time.monotonic() if self.heap else None)
+                now = time.monotonic()
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    due.append(heapq.heappop(self.heap))
+
+            try:
+                receipts = self.client.call_batch(
+                    [("eth_getTransactionReceipt", [tx_hash]) for _, tx_hash, _, _, _ in due])
+            except RpcError:
+                # An unhealthy RPC is treated like "not mined yet", the deadline still applies.
+                receipts = [None] * len(due)
+
+            now = time.monotonic()
+            resolved = []
+            with self.condition:
+                for (_, tx_hash, interval, deadline, future), receipt in zip(due, receipts):
+                    if receipt:
+                        resolved.append((future, int(receipt.get("status", "0x0"), 16) == 1))
+                    elif now >= deadline:
+                        resolved.append((future, None))
+                    else:
+                        next_poll = min(now + interval, deadline)
+                        heapq.heappush(self.heap, (next_poll, tx_hash, min(interval * self.backoff, self.max_interval),
+                                                   deadline, future))
+            # Callbacks may call the RPC themselves, they must not run under the lock.
+            for future, result in resolved:
+                future.set_result(result)
+
+
+class RpcStubServer:
+    """
+    Minimal local JSON-RPC endpoint imitating the Zora RPC for offline testing.
+
+    Transactions registered with `add_transaction` get a receipt `delay` seconds later; unknown
+    hashes never do. Nonces of addresses are 0 unless set with `set_nonce`. Fees are constant (`base_fee`, `priority_fee` in wei); with `fee_history`
+    off, `eth_feeHistory` is rejected like on endpoints that don't serve it. Batch requests are
+    supported.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, chain_id=ZORA_CHAIN_ID, base_fee=252, priority_fee=1000000,
+                 fee_history=True):
+        self.chain_id = chain_id
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+        self.fee_history = fee_history
+        self.transactions = {}
+        self.nonces = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_transaction(self, tx_hash, delay=0.0, status=1):
+        with self.lock:
+            self.transactions[tx_hash] = (time.monotonic() + delay, status)
+
+    def set_nonce(self, address, latest, pending=None):
+        with self.lock:
+            self.nonces[address.lower()] = (latest, latest if pending is None else pending)
+
+    def result(self, method, params):
+        with self.lock:
+            self.calls.append(method)
+            if method == "eth_chainId":
+                return hex(self.chain_id)
+            if method == "eth_getTransactionReceipt":
+                ready_at, status = self.transactions.get(params[0], (None, None))
+                if ready_at is None or time.monotonic() < ready_at:
+                    return None
+                return {"transactionHash": params[0], "status": hex(status), "blockNumber": "0x1"}
+            if method == "eth_getTransactionByHash":
+                return {"hash": params[0]} if params[0] in self.transactions else None
+            if method == "eth_getTransactionCount":
+                latest, pending = self.nonces.get(params[0].lower(), (0, 0))
+                return hex(pending if params[1] == "pending" else latest)
+            if method == "eth_gasPrice":
+                return hex(self.base_fee + self.priority_fee)
+            if method == "eth_feeHistory" and self.fee_history:
+                blocks = int(params[0], 16)
+                return {"oldestBlock": "0x1", "baseFeePerGas": [hex(self.base_fee)] * (blocks + 1),
+                        "gasUsedRatio": [0.5] * blocks,
+                        "reward": [[hex(self.priority_fee)] * len(params[2])] * blocks}
+        raise KeyError(method)
+
+    def handle(self, request):
+        try:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "result": self.result(request.get("method"), request.get("params", []))}
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if isinstance(request, list):
+                    response = [stub.handle(item) for item in request]
+                else:
+                    response = stub.handle(request)
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Run the stub locally, point ZORA_RPC_URL in config_user.json at it.
+    stub = RpcStubServer(port=8545).start()
+    print(f"Zora RPC stub listening on {stub.url}")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()